@@ -51,8 +51,12 @@ class AIState(State):
         Checks if there is a game over
         :return: returns the game over state
         """
-        if self.game.collision() or self.frameIteration > 100 * len(self.snake.getBody()):
+        if self.game.collision():
             self.gameOver = True
+            self.gameOverCause = 'collision'
+        elif self.frameIteration > 100 * len(self.snake.getBody()):
+            self.gameOver = True
+            self.gameOverCause = 'timeout'
 
         return self.gameOver
 
@@ -102,4 +106,5 @@ class AIState(State):
         self.reward = 0
 
         self.gameOver = False
+        self.gameOverCause = None
         self.frameIteration = 0
@@ -0,0 +1,89 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for caching the model's action for every possible state
+"""
+
+import numpy as np
+import torch
+
+STATEBITS = 11
+
+# Weight of each state feature in the packed state
+BITWEIGHTS = (1 << np.arange(STATEBITS)).astype(np.uint16)
+
+
+def packStates(states):
+    """
+    Packs states of 11 booleans into integers, feature i becoming bit i
+    :param states: Array of states of shape (..., 11)
+    :return: Array of packed states of shape (...)
+    """
+    return (np.asarray(states, dtype=np.uint16) * BITWEIGHTS).sum(axis=-1, dtype=np.uint16)
+
+
+def unpackStates(packed):
+    """
+    Unpacks integers from packStates back into states of 11 booleans
+    :param packed: Array of packed states
+    :return: Bool array of states of shape (..., 11)
+    """
+    return ((np.asarray(packed, dtype=np.uint16)[..., None] >> np.arange(STATEBITS)) & 1).astype(bool)
+
+
+class ActionCache:
+    """
+    class   : ActionCache
+    purpose : Holds the model's Q values and best action for all 2048 possible states, so choosing an
+              action is an array lookup. The table is rebuilt lazily, in one batched forward pass,
+              the first time it is used after the weights change
+    """
+
+    def __init__(self, model):
+        """
+        Creates an instance of ActionCache
+        :param model: The model whose actions are cached
+        """
+        self.model = model
+        self.frozen = False
+        self.qValues = None
+        self.actions = None
+
+        # Every possible state, in packed order
+        self.allStates = torch.from_numpy(unpackStates(np.arange(1 << STATEBITS)).astype(np.float32))
+
+    def invalidate(self):
+        """
+        Marks the table as out of date after the weights change, does nothing once frozen
+        """
+        if not self.frozen:
+            self.qValues = None
+            self.actions = None
+
+    def freeze(self):
+        """
+        Builds the table and keeps it for good, for when the weights will not change again
+        """
+        self.rebuild()
+        self.frozen = True
+
+    def rebuild(self):
+        """
+        Computes the Q values and best action of every state in one forward pass
+        """
+        with torch.inference_mode():
+            qValues = self.model(self.allStates)
+
+        self.qValues = qValues.numpy()
+        self.actions = torch.argmax(qValues, dim=1).numpy()
+
+    def lookup(self, states):
+        """
+        Looks up the best actions for a batch of states
+        :param states: Array of states of shape (batch, 11)
+        :return: Array of action indices [straight, right, left]
+        """
+        if self.actions is None:
+            self.rebuild()
+
+        return self.actions[packStates(states)]
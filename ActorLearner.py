@@ -0,0 +1,164 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for training with several actor processes and one learner process
+"""
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from queue import Empty
+from Agent import Agent
+from SnakeGame import SnakeGame
+from Model import LinearQNet
+
+CHUNKSIZE = 100        # Transitions an actor sends at once
+SYNCINTERVAL = 500     # Actor steps between checks for new weights
+BROADCASTINTERVAL = 10 # Learner train steps between weight broadcasts
+
+
+def syncWeights(model, sharedModel, version, lock, localVersion):
+    """
+    Copies the shared weights into a model if they are newer than its copy
+    :param model: The model to update
+    :param sharedModel: The model in shared memory
+    :param version: Shared counter of the weight version
+    :param lock: Lock guarding the shared model
+    :param localVersion: The version the model currently holds
+    :return: The version the model now holds
+    """
+    if version.value == localVersion:
+        return localVersion
+
+    with lock:
+        model.load_state_dict(sharedModel.state_dict())
+        localVersion = version.value
+
+    return localVersion
+
+
+def actor(actorId, sharedModel, version, lock, queue, stopEvent):
+    """
+    Plays games with a periodically synced copy of the model, sending the transitions and scores
+    to the learner
+    :param actorId: The number of the actor
+    :param sharedModel: The model in shared memory
+    :param version: Shared counter of the weight version
+    :param lock: Lock guarding the shared model
+    :param queue: Queue to the learner
+    :param stopEvent: Event set when the actor should stop
+    """
+    # Each actor uses one core, the processes give the parallelism
+    torch.set_num_threads(1)
+
+    # The weights only change on a sync, so actions come from a table rebuilt after each one.
+    # The learner does the training, so the actor has no memory or trainer
+    agent = Agent(inference=True)
+    agent.useActionCache()
+    game = SnakeGame(ai=True, headless=True)
+    localVersion = syncWeights(agent.model, sharedModel, version, lock, -1)
+
+    chunk = []
+    steps = 0
+
+    while not stopEvent.is_set():
+        stateOld = agent.getState(game)
+        finalAction = agent.getAction(stateOld)
+        stateNew, reward, done, info = game.step(finalAction)
+
+        chunk.append((stateOld, finalAction.index(1), reward, stateNew, done))
+
+        if len(chunk) == CHUNKSIZE:
+            states, actions, rewards, nextStates, dones = zip(*chunk)
+            queue.put(("transitions", np.array(states, dtype=np.uint8), np.array(actions, dtype=np.int8),
+                       np.array(rewards, dtype=np.float32), np.array(nextStates, dtype=np.uint8),
+                       np.array(dones, dtype=bool)))
+            chunk = []
+
+        if done:
+            game.reset()
+            agent.games += 1
+            queue.put(("score", actorId, info['score']))
+
+        steps += 1
+        if steps % SYNCINTERVAL == 0:
+            newVersion = syncWeights(agent.model, sharedModel, version, lock, localVersion)
+
+            if newVersion != localVersion:
+                agent.modelUpdated()
+                localVersion = newVersion
+
+
+def trainDistributed(numActors, prioritized=False, compact=False):
+    """
+    Trains the model with actor processes playing games and this process learning from them
+    :param numActors: The number of actor processes
+    :param prioritized: Use prioritized experience replay
+    :param compact: Use the bit packed replay memory
+    """
+    context = mp.get_context("spawn")
+
+    # The learner owns the trainer, actors read the weights from shared memory
+    agent = Agent(prioritized=prioritized, compact=compact)
+    sharedModel = LinearQNet(11, 256, 3)
+    sharedModel.load_state_dict(agent.model.state_dict())
+    sharedModel.share_memory()
+
+    version = context.Value("l", 0)
+    lock = context.Lock()
+    queue = context.Queue(maxsize=8 * numActors)
+    stopEvent = context.Event()
+
+    actors = [context.Process(target=actor, args=(actorId, sharedModel, version, lock, queue, stopEvent), daemon=True)
+              for actorId in range(numActors)]
+
+    for process in actors:
+        process.start()
+
+    # For Plots (imported here so the actor processes do not import matplotlib)
+    from Plot import Plot
+    plot = Plot()
+    totalScore = 0
+    highestScore = 0
+    trainSteps = 0
+
+    try:
+        while True:
+            message = queue.get()
+
+            if message[0] == "transitions":
+                # Train on the new transitions (short memory) then on a sample of the long memory
+                indices = agent.memory.pushBatch(*message[1:])
+                agent.trainer.trainBatch(*agent.memory.gather(indices))
+                agent.trainLongMemory()
+
+                trainSteps += 1
+                if trainSteps % BROADCASTINTERVAL == 0:
+                    with lock:
+                        sharedModel.load_state_dict(agent.model.state_dict())
+                        version.value += 1
+
+            elif message[0] == "score":
+                _, actorId, score = message
+                agent.games += 1
+
+                if score > highestScore:
+                    highestScore = score
+                    agent.model.save()
+
+                print('Game', agent.games, 'Actor', actorId, 'Score', score, 'High Score:', highestScore)
+
+                totalScore += score
+                plot.record(score, totalScore / agent.games)
+    finally:
+        stopEvent.set()
+        plot.close()
+
+        # Drain the queue so actors blocked on put can see the stop event
+        for process in actors:
+            while process.is_alive():
+                try:
+                    queue.get(timeout=0.1)
+                except Empty:
+                    pass
+                process.join(timeout=0.1)
@@ -6,20 +6,42 @@
     NOTE      : All code based off reference
 """
 
-import torch
 import random
 import numpy as np
-import sys
 import os
-from collections import deque
-from SnakeGame import SnakeGame, Point
-from Direction import Direction
-from Model import LinearQNet, QTrainer
-from Plot import Plot
+import argparse
+from SnakeGame import SnakeGame
+from NumpyModel import NumpyQNet
+from EpisodeRecorder import EpisodeRecorder
+from Profiler import PhaseTimer, NullTimer, EpisodeProfiler, PROFILEINTERVAL
+
+# NOTE: torch and the modules built on it are only imported once an agent with the torch backend is created
+torch = None
 
 MAXMEMORY = 100_000
 BATCHSIZE = 1000
 LR = 0.001
+CHECKPOINTINTERVAL = 50 # Games between checkpoints
+
+# The training flags that choose each type of replay memory
+MEMORYFLAGS = {'ReplayMemory': 'neither --prioritized nor --compact-memory',
+               'PrioritizedReplayMemory': '--prioritized', 'CompactReplayMemory': '--compact-memory'}
+
+# The model file each backend loads by default
+MODELFILES = {'torch': 'model.pth', 'numpy': 'model.npz', 'torchscript': 'model.pt', 'quantized': 'model_int8.pt'}
+
+
+def importTorch():
+    """
+    Imports torch and the modules built on it
+    """
+    global torch, LinearQNet, QTrainer, ReplayMemory, PrioritizedReplayMemory, CompactReplayMemory, ActionCache
+
+    import torch
+    from Model import LinearQNet, QTrainer
+    from ReplayMemory import ReplayMemory, PrioritizedReplayMemory, CompactReplayMemory
+    from ActionCache import ActionCache
+
 
 class Agent:
     """
@@ -27,71 +49,98 @@ class Agent:
     purpose : The Agent for the snake game
     """
 
-    def __init__(self):
+    def __init__(self, prioritized=False, compact=False, backend='torch', shortBatch=1, inference=False):
         """
         Creates an instance of Agent and initializes it
+        :param prioritized: Use prioritized experience replay for the long memory
+        :param compact: Use the bit packed replay memory for the long memory
+        :param backend: 'torch' to train and run the model, or 'numpy', 'torchscript' or 'quantized' to
+                        only run an exported model
+        :param shortBatch: The number of transitions trained on together by the short memory
+        :param inference: Only choose actions with the torch model, without a memory or trainer
         """
         self.games = 0
 
         self.epsilon = 0 # randomness
         self.gamma = 0   # discount rate
 
-        self.memory = deque(maxlen=MAXMEMORY)
+        self.prioritized = prioritized
+        self.backend = backend
+
+        # Table of the action for every state, off unless useActionCache is called
+        self.actionCache = None
+
+        if self.backend == 'numpy':
+            # Inference only, so no memory or trainer
+            self.memory = None
+            self.model = NumpyQNet()
+            self.trainer = None
+            return
+
+        importTorch()
+
+        # Preallocated input and output for action selection, with NumPy views to write and read them
+        self._allocateActionBuffers(1)
+
+        if self.backend != 'torch':
+            # Inference only, the TorchScript module is created by loadModel
+            self.memory = None
+            self.model = None
+            self.trainer = None
+            return
+
         self.model = LinearQNet(11, 256, 3)
+
+        if inference:
+            # Chooses actions with weights trained elsewhere, so no memory or trainer
+            self.memory = None
+            self.trainer = None
+            return
+
+        if self.prioritized:
+            self.memory = PrioritizedReplayMemory(MAXMEMORY, 11)
+        elif compact:
+            self.memory = CompactReplayMemory(MAXMEMORY, 11)
+        else:
+            self.memory = ReplayMemory(MAXMEMORY, 11)
+
         self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
+
+        # Recent transitions waiting to be trained on by the short memory
+        self.shortBatch = shortBatch
+        self.shortMemory = list()
         # TODO: model and trainer
 
 
+    def useActionCache(self, frozen=False):
+        """
+        Chooses trained actions from a table of the model's action for every possible state. Worth it
+        when the weights change rarely compared to the number of actions chosen. The NumPy backend is
+        cheap enough per state that it does not use the table
+        :param frozen: Build the table once and never rebuild it (the weights will not change)
+        """
+        if self.backend == 'numpy':
+            return
+
+        self.actionCache = ActionCache(self.model)
+
+        if frozen:
+            self.actionCache.freeze()
+
+    def modelUpdated(self):
+        """
+        Tells the agent the model weights have changed
+        """
+        if self.actionCache != None:
+            self.actionCache.invalidate()
+
     def getState(self, game):
         """
         Gets the state from the game
         :param game: A pointer to the game object
+        :return: Read only bool array of the 11 state features, cached by the game for each frame
         """
-        head = game.state.snake.getHead()
-        pointLeft = Point(head.x - 20, head.y)
-        pointRight = Point(head.x + 20, head.y)
-        pointUp = Point(head.x, head.y - 20)
-        pointDown = Point(head.x, head.y + 20)
-
-        dirLeft = game.state.snake.getDirection() == Direction.LEFT
-        dirRight = game.state.snake.getDirection() == Direction.RIGHT
-        dirUp = game.state.snake.getDirection() == Direction.UP
-        dirDown = game.state.snake.getDirection() == Direction.DOWN
-
-        state = [
-            # Danger Straight
-            (dirRight and game.collision(pointRight)) or
-            (dirLeft and game.collision(pointLeft)) or
-            (dirUp and game.collision(pointUp)) or
-            (dirDown and game.collision(pointDown)),
-
-            # Danger Right
-            (dirUp and game.collision(pointRight)) or
-            (dirDown and game.collision(pointLeft)) or
-            (dirLeft and game.collision(pointUp)) or
-            (dirRight and game.collision(pointDown)),
-
-            # Danger Left
-            (dirDown and game.collision(pointRight)) or
-            (dirUp and game.collision(pointLeft)) or
-            (dirRight and game.collision(pointUp)) or
-            (dirLeft and game.collision(pointDown)),
-
-            # Move Direction
-            dirLeft,
-            dirRight,
-            dirUp,
-            dirDown,
-
-            # Food Location
-            game.food.x < game.state.snake.head.x,  # food left
-            game.food.x > game.state.snake.head.x,  # food right
-            game.food.y < game.state.snake.head.y,  # food up
-            game.food.y > game.state.snake.head.y  # food down
-        ]
-
-        return state
-
+        return game.getObservation()
 
     def remember(self, state, action, reward, nextState, done):
         """
@@ -102,22 +151,22 @@ class Agent:
         :param nextState: The next state
         :param done: If the game has finished
         """
-        # Pops left if memory limit is reached (hence forgets old memory)
-        self.memory.append((state, action, reward, nextState, done))
+        # Overwrites the oldest memory if memory limit is reached (hence forgets old memory)
+        self.memory.push(state, action.index(1), reward, nextState, done)
 
     def trainLongMemory(self):
         """
         Uses the trainer to train the long memory
         """
-        if len(self.memory) > BATCHSIZE:
-            miniSample = random.sample(self.memory, BATCHSIZE)
+        if self.prioritized:
+            states, actions, rewards, nextStates, dones, indices, weights = self.memory.sample(BATCHSIZE)
+            tdErrors = self.trainer.trainBatch(states, actions, rewards, nextStates, dones, weights)
+            self.memory.updatePriorities(indices, tdErrors.numpy())
         else:
-            miniSample = self.memory
+            states, actions, rewards, nextStates, dones = self.memory.sample(BATCHSIZE)
+            self.trainer.trainBatch(states, actions, rewards, nextStates, dones)
 
-        # Take all the data from the miniSample
-        states, actions, rewards, nextStates, dones = zip(*miniSample)
-
-        self.trainer.trainStep(states, actions, rewards, nextStates, dones)
+        self.modelUpdated()
 
 
     def trainShortMemory(self, state, action, reward, nextState, done):
@@ -129,7 +178,20 @@ class Agent:
         :param nextState: The next state of the game
         :param done: If the game is finished
         """
-        self.trainer.trainStep(state, action, reward, nextState, done)
+        if self.shortBatch <= 1:
+            self.trainer.trainStep(state, action, reward, nextState, done)
+            self.modelUpdated()
+            return
+
+        # Train on every shortBatch transitions at once, and at the end of each game so the
+        # batch never spans two games
+        self.shortMemory.append((state, action, reward, nextState, done))
+
+        if len(self.shortMemory) >= self.shortBatch or done:
+            states, actions, rewards, nextStates, dones = zip(*self.shortMemory)
+            self.trainer.trainStep(np.array(states), actions, rewards, np.array(nextStates), dones)
+            self.shortMemory.clear()
+            self.modelUpdated()
 
     def getAction(self, state):
         """
@@ -155,62 +217,161 @@ class Agent:
         """
 
         finalAction = [0, 0, 0]
-        state0 = torch.tensor(state, dtype=torch.float)
-        prediction = self.model(state0)
-        action = torch.argmax(prediction).item()
+        action = self.getTrainedActions((state, ))[0]
         finalAction[action] = 1
         
         return finalAction
 
-    def loadModel(self, filename='model.pth'):
+    def _allocateActionBuffers(self, count):
+        """
+        Allocates the buffers used by getTrainedActions
+        :param count: The largest batch the buffers hold
+        """
+        self.inputBuffer = torch.empty((count, 11))
+        self.inputArray = self.inputBuffer.numpy()
+        self.actionBuffer = torch.empty(count, dtype=torch.long)
+        self.actionArray = self.actionBuffer.numpy()
+
+    def getTrainedActions(self, states):
+        """
+        Determines the actions for a batch of states, e.g. from many games (Only uses trained actions)
+        :param states: Array (or sequence) of states of shape (batch, 11)
+        :return: Array of action indices [straight, right, left], a view of a buffer that is reused by
+                 the next call with the torch backends
+        """
+        if self.actionCache != None:
+            return self.actionCache.lookup(states)
+
+        if self.backend == 'numpy':
+            return np.argmax(self.model(states), axis=1)
+
+        count = len(states)
+
+        # Reuse the buffers, only growing them for a larger batch
+        if self.inputBuffer.shape[0] < count:
+            self._allocateActionBuffers(count)
+
+        self.inputArray[:count] = states
+
+        with torch.inference_mode():
+            prediction = self.model(self.inputBuffer[:count])
+            torch.argmax(prediction, dim=1, out=self.actionBuffer[:count])
+
+        return self.actionArray[:count]
+
+    def loadModel(self, filename=None):
         """
         Loads a model from a file
-        :param filename: The filename of the model file
+        :param filename: The filename of the model file, None for the default file of the backend
         """
         modelFolderPath = './model'
+
+        if filename == None:
+            filename = MODELFILES[self.backend]
+
         filename = os.path.join(modelFolderPath, filename)
 
+        if self.backend == 'numpy':
+            self.model.load(filename)
+            return
+
+        if self.backend != 'torch':
+            self.model = torch.jit.load(filename)
+            return
+
         self.model.load_state_dict(torch.load(filename))
         self.model.eval()
+        self.modelUpdated()
 
 
-def train():
+def train(prioritized=False, compact=False, resume=False, checkpointInterval=CHECKPOINTINTERVAL, checkpointMemory=False,
+          profileInterval=0, profileEpisodes=0, recordPath=None, shortBatch=1):
     """
     Trains the model using the agent and the game
+    :param prioritized: Use prioritized experience replay
+    :param compact: Use the bit packed replay memory
+    :param resume: Resume from the last checkpoint
+    :param checkpointInterval: Games between checkpoints (0 disables them)
+    :param checkpointMemory: Include the replay memory in checkpoints
+    :param profileInterval: Games between summaries of the time spent in each phase (0 disables them)
+    :param profileEpisodes: Number of games to run cProfile over (0 disables it)
+    :param recordPath: File to record every game to for replaying (None disables it)
+    :param shortBatch: The number of steps between short memory training steps, each on all of them
     """
-    # For Plots
-    plot = Plot()
-    plotScores = list()
-    plotMeanScores = list()
     totalScore = 0
     meanScore = 0
 
     highestScore = 0
-    agent = Agent()
-    game = SnakeGame(ai=True)
+    agent = Agent(prioritized=prioritized, compact=compact, shortBatch=shortBatch)
+    game = SnakeGame(ai=True, headless=True)
+
+    from Checkpoint import Checkpointer
+    checkpointer = Checkpointer(interval=checkpointInterval, includeMemory=checkpointMemory)
+
+    if resume and checkpointer.exists():
+        training = checkpointer.load(agent, game)
+        highestScore = training['highestScore']
+        totalScore = training['totalScore']
+        print('Resuming from game', agent.games)
+
+    # For Recording, every game starts from a recorded seed
+    recorder = EpisodeRecorder(recordPath) if recordPath != None else None
+
+    if recorder != None:
+        game.reset(seed=recorder.nextSeed())
+
+    # For Plots (matplotlib is only imported for training)
+    from Plot import Plot
+    plot = Plot(resumeGames=agent.games)
+
+    # For Profiling
+    # Counted from the games already played, so resuming still profiles whole intervals
+    timer = PhaseTimer(profileInterval, startGames=agent.games) if profileInterval > 0 else NullTimer()
+    profiler = EpisodeProfiler(profileEpisodes, startGames=agent.games) if profileEpisodes > 0 else None
 
     while True:
-        # Get old/current state
+        # Get old/current state (cached from the last step)
+        start = timer.start()
         stateOld = agent.getState(game)
+        timer.stop('getState', start)
 
         # Get move based on current state
+        start = timer.start()
         finalAction = agent.getAction(stateOld)
+        timer.stop('getAction', start)
+
+        if recorder != None:
+            recorder.record(finalAction)
 
         # Perform the move and get next state
-        reward, done, score = game.playStep(finalAction)
-        stateNew = agent.getState(game)
+        start = timer.start()
+        stateNew, reward, done, info = game.step(finalAction)
+        score = info['score']
+        timer.stop('step', start)
 
         # Train short memory
+        start = timer.start()
         agent.trainShortMemory(stateOld, finalAction, reward, stateNew, done)
+        timer.stop('trainShortMemory', start)
 
         # Remember (to store in the memory)
+        start = timer.start()
         agent.remember(stateOld, finalAction, reward, stateNew, done)
+        timer.stop('remember', start)
+        timer.step()
 
         if done:
             # Train long memory
-            game.reset()
+            if recorder != None:
+                recorder.endEpisode(score)
+                game.reset(seed=recorder.nextSeed())
+            else:
+                game.reset()
             agent.games += 1
+
+            start = timer.start()
             agent.trainLongMemory()
+            timer.stop('trainLongMemory', start)
 
             if score > highestScore:
                 highestScore = score
@@ -218,20 +379,32 @@ def train():
 
             print('Game', agent.games, 'Score', score, 'High Score:', highestScore)
 
-            plotScores.append(score)
+            start = timer.start()
             totalScore += score
             meanScore = totalScore / agent.games
-            plotMeanScores.append(meanScore)
-            plot.plot(plotScores, plotMeanScores)
+            plot.record(score, meanScore)
+            timer.stop('plot', start)
+
+            if checkpointer.isDue(agent.games):
+                start = timer.start()
+                checkpointer.save(agent, game, {'highestScore': highestScore, 'totalScore': totalScore})
+                timer.stop('checkpoint', start)
 
-def run():
+            timer.endGame(agent.games)
+
+            if profiler != None:
+                profiler.endGame(agent.games)
+
+def run(backend='torch'):
     """
     Runs the model without training it
+    :param backend: 'torch' to run model/model.pth, or 'numpy' to run model/model.npz without torch
     """
     
     highestScore = 0
-    agent = Agent()
+    agent = Agent(backend=backend, inference=True)
     agent.loadModel()
+    agent.useActionCache(frozen=True)
     game = SnakeGame(ai=True)
     done = False    
 
@@ -240,21 +413,78 @@ def run():
 
         finalAction = agent.getTrainedAction(stateOld)
 
-        reward, done, score = game.playStep(finalAction)
-        stateNew = agent.getState(game)
+        stateNew, reward, done, info = game.step(finalAction)
     
-    print("Score was:", score)
+    print("Score was:", info['score'])
+
+
+def export():
+    """
+    Exports the trained model for the other backends
+    """
+    agent = Agent(inference=True)
+    agent.loadModel()
+    agent.model.exportNumpy(MODELFILES['numpy'])
+    agent.model.exportTorchScript(MODELFILES['torchscript'])
+    agent.model.exportQuantized(MODELFILES['quantized'])
+
+    print('Exported', MODELFILES['torch'], 'to', MODELFILES['numpy'] + ',', MODELFILES['torchscript'], 'and',
+          MODELFILES['quantized'])
 
 
 if __name__ == "__main__":
-    usage = "Invalid Usage: python3 Agent.py <run/train>"
-
-    if len(sys.argv) != 2:
-        print(usage)
-    else:
-        if sys.argv[1] == "run":
-            run()
-        elif sys.argv[1] == "train":
-            train()
+    parser = argparse.ArgumentParser(description="Trains, runs or exports the snake game agent")
+    parser.add_argument("mode", choices=["run", "train", "export"],
+                        help="run the trained model, train a new one or export it for the other backends")
+    parser.add_argument("--backend", choices=list(MODELFILES), default="torch",
+                        help="backend to run the model with, all but torch run a model written by export "
+                             "(numpy runs it without torch, quantized with int8 weights)")
+    parser.add_argument("--prioritized", action="store_true", help="use prioritized experience replay when training")
+    parser.add_argument("--compact-memory", action="store_true",
+                        help="store the replay memory bit packed (about 6 bytes per transition)")
+    parser.add_argument("--actors", type=int, default=0,
+                        help="number of actor processes playing games for one learner process (0 trains in this process)")
+    parser.add_argument("--resume", action="store_true", help="resume training from the last checkpoint")
+    parser.add_argument("--checkpoint-interval", type=int, default=None,
+                        help="games between training checkpoints (default %d, 0 disables them)" % CHECKPOINTINTERVAL)
+    parser.add_argument("--checkpoint-memory", action="store_true", help="include the replay memory in checkpoints")
+    parser.add_argument("--profile", type=int, nargs="?", const=PROFILEINTERVAL, default=0, metavar="GAMES",
+                        help="print and log the time spent in each phase of training every GAMES games")
+    parser.add_argument("--profile-episodes", type=int, default=0, metavar="GAMES",
+                        help="run cProfile over the first GAMES games and dump the stats to profiles/train.prof")
+    parser.add_argument("--record", nargs="?", const=os.path.join("recordings", "episodes.bin"), default=None,
+                        metavar="FILE", help="record every game to FILE (default recordings/episodes.bin) for replaying")
+    parser.add_argument("--short-batch", type=int, default=1, metavar="K",
+                        help="train the short memory on every K steps at once instead of on every step")
+    args = parser.parse_args()
+
+    # The actor/learner mode does not checkpoint, so it cannot be resumed either
+    if args.actors > 0 and (args.resume or args.checkpoint_interval != None or args.checkpoint_memory or args.profile
+                            or args.profile_episodes or args.record or args.short_batch > 1):
+        parser.error("checkpoints, --resume, profiling, --record and --short-batch are only supported without --actors")
+
+    if args.checkpoint_interval == None:
+        args.checkpoint_interval = CHECKPOINTINTERVAL
+
+    if args.prioritized and args.compact_memory:
+        parser.error("--prioritized and --compact-memory cannot be used together")
+
+    if args.mode == "run":
+        run(backend=args.backend)
+    elif args.mode == "export":
+        export()
+    elif args.mode == "train":
+        if args.actors > 0:
+            from ActorLearner import trainDistributed
+            trainDistributed(args.actors, prioritized=args.prioritized, compact=args.compact_memory)
         else:
-            print(usage)
+            from Checkpoint import MemoryTypeError
+
+            try:
+                train(prioritized=args.prioritized, compact=args.compact_memory, resume=args.resume,
+                      checkpointInterval=args.checkpoint_interval, checkpointMemory=args.checkpoint_memory,
+                      profileInterval=args.profile, profileEpisodes=args.profile_episodes, recordPath=args.record,
+                      shortBatch=args.short_batch)
+            except MemoryTypeError as error:
+                parser.error("cannot resume, " + str(error) + ". Resume with " + MEMORYFLAGS[error.savedType]
+                             + " like the run that saved it")
@@ -0,0 +1,451 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for benchmarking the game engine and trainer hot paths
+"""
+
+import os
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import numpy as np
+import torch
+from SnakeGame import SnakeGame, Point, BLOCKSIZE
+from VecSnakeGame import VecSnakeGame, DX, DY, TURNS
+from Agent import Agent, BATCHSIZE, MAXMEMORY, MODELFILES
+from Model import LinearQNet
+from ActionCache import unpackStates, STATEBITS
+
+BOARDSIZES = [(320, 320), (640, 640), (1280, 1280)]
+SNAKELENGTHS = [3, 50, 200, 800]
+NUMGAMES = [1, 16, 256, 4096]
+REPEATS = 5
+
+
+def timeCalls(function, number, repeats=REPEATS):
+    """
+    Times a function, taking the median of several repeats
+    :param function: The function to time, called with no arguments
+    :param number: The number of calls in each repeat
+    :param repeats: The number of repeats
+    :return: Median seconds per call
+    """
+    times = list()
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+
+        for _ in range(number):
+            function()
+
+        times.append((time.perf_counter() - start) / number)
+
+    return float(np.median(times))
+
+
+def randomAction():
+    """
+    Returns a random one hot action
+    :return: The action
+    """
+    finalAction = [0, 0, 0]
+    finalAction[random.randint(0, 2)] = 1
+    return finalAction
+
+
+def setSnakeLength(game, length):
+    """
+    Replaces the snake with one of the given length, laid out row by row from the top left
+    :param game: The game to change
+    :param length: The length of the snake
+    """
+    snake = game.state.snake
+    cols = game.width // BLOCKSIZE
+
+    # Row by row, alternating direction so every segment touches the next
+    path = list()
+    for index in range(length):
+        row, col = divmod(index, cols)
+        if row % 2 == 1:
+            col = cols - 1 - col
+        path.append(Point(col * BLOCKSIZE, row * BLOCKSIZE))
+
+    while len(snake.getBody()) > 0:
+        snake.popBody()
+
+    # Insert from the tail so the head ends up at the end of the path
+    for point in path:
+        snake.head = point
+        snake.insertBody()
+
+    game._placeFood()
+
+
+def benchmarkPlayStep(steps):
+    """
+    Measures headless SnakeGame.playStep throughput with random actions
+    :param steps: The number of steps per repeat
+    :return: List of results for each board size
+    """
+    results = list()
+
+    for width, height in BOARDSIZES:
+        game = SnakeGame(width, height, ai=True, headless=True)
+        actions = [randomAction() for _ in range(1000)]
+        step = [0]
+
+        def playStep():
+            _, done, _ = game.playStep(actions[step[0] % 1000])
+            step[0] += 1
+            if done:
+                game.reset()
+
+        perCall = timeCalls(playStep, steps)
+        results.append({'width': width, 'height': height, 'stepsPerSecond': 1 / perCall})
+
+    return results
+
+
+def greedyActions(vecGame, randomness=0.1):
+    """
+    Chooses actions that head for the food without dying where possible, with some random ones
+    :param vecGame: The VecSnakeGame to choose actions for
+    :param randomness: The chance of a random action
+    :return: Array of action indices [straight, right, left]
+    """
+    directions = (vecGame.direction[:, None] + TURNS) % 4
+    headX = vecGame.headX[:, None] + DX[directions]
+    headY = vecGame.headY[:, None] + DY[directions]
+
+    outOfBounds = (headX < 0) | (headX >= vecGame.cols) | (headY < 0) | (headY >= vecGame.rows)
+    cells = np.where(outOfBounds, 0, headY * vecGame.cols + headX)
+    dangers = outOfBounds | vecGame.grid[np.arange(vecGame.numGames)[:, None], cells]
+
+    distances = np.abs(headX - vecGame.foodX[:, None]) + np.abs(headY - vecGame.foodY[:, None])
+    actions = np.argmin(distances + dangers * vecGame.numCells, axis=1)
+
+    randoms = np.random.rand(vecGame.numGames) < randomness
+    actions[randoms] = np.random.randint(0, 3, randoms.sum())
+
+    return actions
+
+
+def checkVecSnakeGame(steps, numGames=8):
+    """
+    Checks VecSnakeGame plays the same games, and gives the same observations, as SnakeGame given the
+    same actions, copying each
+    game's food into the SnakeGame since the two place it with different random numbers
+    :param steps: The number of steps to play on each board size
+    :param numGames: The number of games to play at once
+    :return: The number of steps checked
+    """
+    for width, height in BOARDSIZES:
+        vecGame = VecSnakeGame(numGames, width, height, seed=0)
+        games = [SnakeGame(width, height, ai=True, headless=True) for _ in range(numGames)]
+
+        for index, game in enumerate(games):
+            game.food = vecGame.getFood(index)
+
+        for step in range(steps):
+            # Mostly greedy so the snakes eat and grow
+            actions = greedyActions(vecGame)
+            rewards, dones, scores = vecGame.step(actions)
+
+            for index, game in enumerate(games):
+                finalAction = [0, 0, 0]
+                finalAction[actions[index]] = 1
+                reward, done, score = game.playStep(finalAction)
+
+                if (reward, done, score) != (rewards[index], dones[index], scores[index]):
+                    raise RuntimeError('VecSnakeGame game %d on %dx%d differs from SnakeGame at step %d: reward, done, '
+                                       'score %s vs %s' % (index, width, height, step,
+                                                           (rewards[index], dones[index], scores[index]),
+                                                           (reward, done, score)))
+
+                if done:
+                    game.reset()
+
+                game.food = vecGame.getFood(index)
+                head = vecGame.getBody(index)[0]
+
+                if head != game.state.snake.getHead() or vecGame.getBody(index) != list(game.state.snake.getBody()):
+                    raise RuntimeError('VecSnakeGame game %d on %dx%d differs from SnakeGame at step %d: body %s vs %s'
+                                       % (index, width, height, step, vecGame.getBody(index),
+                                          list(game.state.snake.getBody())))
+
+            # The food is copied after the step, so the cached observations are out of date
+            observations = vecGame.getObservations()
+
+            for index, game in enumerate(games):
+                game.observation = None
+
+                if not np.array_equal(observations[index], game.getObservation()):
+                    raise RuntimeError('VecSnakeGame game %d on %dx%d differs from SnakeGame at step %d: observation '
+                                       '%s vs %s' % (index, width, height, step, observations[index].astype(int),
+                                                     game.getObservation().astype(int)))
+
+    return steps * numGames * len(BOARDSIZES)
+
+
+def benchmarkVecStep(steps):
+    """
+    Measures VecSnakeGame.step throughput with random actions for several numbers of games
+    :param steps: The number of game steps per repeat, split between the games
+    :return: List of results for each number of games
+    """
+    results = list()
+
+    for numGames in NUMGAMES:
+        vecGame = VecSnakeGame(numGames, seed=0)
+        actions = np.random.randint(0, 3, (100, numGames))
+        step = [0]
+
+        def vecStep():
+            vecGame.step(actions[step[0] % 100])
+            step[0] += 1
+
+        perCall = timeCalls(vecStep, max(10, steps // numGames))
+        results.append({'numGames': numGames, 'stepsPerSecond': numGames / perCall})
+
+    return results
+
+
+def benchmarkGetObservations(calls):
+    """
+    Measures the cost per game of VecSnakeGame.getObservations for several numbers of games
+    :param calls: The number of games to observe per repeat, split between calls
+    :return: List of results for each number of games
+    """
+    results = list()
+
+    for numGames in NUMGAMES:
+        vecGame = VecSnakeGame(numGames, seed=0)
+
+        # Play a while so the snakes are spread over the board
+        for _ in range(50):
+            vecGame.step(greedyActions(vecGame))
+
+        perCall = timeCalls(vecGame.getObservations, max(10, calls // numGames))
+        results.append({'numGames': numGames, 'microsecondsPerGame': perCall / numGames * 1e6})
+
+    return results
+
+
+def benchmarkGetState(calls):
+    """
+    Measures the (uncached) cost of Agent.getState for several snake lengths and board sizes
+    :param calls: The number of calls per repeat
+    :return: List of results for each board size and length
+    """
+    results = list()
+    agent = Agent()
+
+    for width, height in BOARDSIZES:
+        for length in SNAKELENGTHS:
+            if length > (width // BLOCKSIZE) * (height // BLOCKSIZE) // 2:
+                continue
+
+            game = SnakeGame(width, height, ai=True, headless=True)
+            setSnakeLength(game, length)
+
+            # Clear the cached observation so every call computes it
+            def getState():
+                game.observation = None
+                return agent.getState(game)
+
+            perCall = timeCalls(getState, calls)
+            results.append({'width': width, 'height': height, 'length': length, 'microseconds': perCall * 1e6})
+
+    return results
+
+
+def randomTransitions(count):
+    """
+    Makes random transitions in the list format the agent trains on
+    :param count: The number of transitions
+    :return: Tuples of states, actions, rewards, next states and dones
+    """
+    states = [[random.random() < 0.5 for _ in range(11)] for _ in range(count)]
+    actions = [randomAction() for _ in range(count)]
+    rewards = [random.choice([-10, 0, 10]) for _ in range(count)]
+    nextStates = [[random.random() < 0.5 for _ in range(11)] for _ in range(count)]
+    dones = [random.random() < 0.1 for _ in range(count)]
+
+    return states, actions, rewards, nextStates, dones
+
+
+def benchmarkTrainStep(calls):
+    """
+    Measures QTrainer.trainStep latency for a batch of 1 and of BATCHSIZE, and trainBatch for BATCHSIZE
+    :param calls: The number of calls per repeat
+    :return: List of results
+    """
+    agent = Agent()
+    results = list()
+
+    single = [transitions[0] for transitions in randomTransitions(1)]
+    perCall = timeCalls(lambda: agent.trainer.trainStep(*single), calls)
+    results.append({'call': 'trainStep', 'batch': 1, 'milliseconds': perCall * 1e3})
+
+    batch = randomTransitions(BATCHSIZE)
+    perCall = timeCalls(lambda: agent.trainer.trainStep(*batch), max(1, calls // 10))
+    results.append({'call': 'trainStep', 'batch': BATCHSIZE, 'milliseconds': perCall * 1e3})
+
+    for state, action, reward, nextState, done in zip(*batch):
+        agent.remember(state, action, reward, nextState, done)
+
+    tensors = agent.memory.sample(BATCHSIZE)
+    perCall = timeCalls(lambda: agent.trainer.trainBatch(*tensors), max(1, calls // 10))
+    results.append({'call': 'trainBatch', 'batch': BATCHSIZE, 'milliseconds': perCall * 1e3})
+
+    return results
+
+
+def benchmarkSampling(calls):
+    """
+    Measures how fast trainLongMemory can sample a batch from a full memory
+    :param calls: The number of calls per repeat
+    :return: List of results for each memory type
+    """
+    results = list()
+
+    for prioritized in [False, True]:
+        agent = Agent(prioritized=prioritized)
+        count = MAXMEMORY
+        agent.memory.pushBatch(np.random.rand(count, 11) < 0.5, np.random.randint(0, 3, count),
+                               np.random.choice([-10, 0, 10], count), np.random.rand(count, 11) < 0.5,
+                               np.random.rand(count) < 0.1)
+
+        perCall = timeCalls(lambda: agent.memory.sample(BATCHSIZE), calls)
+        results.append({'memory': type(agent.memory).__name__, 'size': count, 'batch': BATCHSIZE,
+                        'samplesPerSecond': BATCHSIZE / perCall, 'milliseconds': perCall * 1e3})
+
+    return results
+
+
+def benchmarkInference(calls):
+    """
+    Measures the latency of choosing one action with each backend (without the action cache), the size
+    of its model file and how often it picks the same action as torch over every possible state
+    :param calls: The number of calls per repeat
+    :return: List of results for each backend
+    """
+    results = list()
+    model = LinearQNet(11, 256, 3)
+    states = np.random.rand(1000, 11) < 0.5
+    allStates = unpackStates(np.arange(1 << STATEBITS))
+    reference = None
+
+    with tempfile.TemporaryDirectory() as modelFolderPath:
+        torch.save(model.state_dict(), os.path.join(modelFolderPath, MODELFILES['torch']))
+        model.exportNumpy(MODELFILES['numpy'], modelFolderPath)
+        model.exportTorchScript(MODELFILES['torchscript'], modelFolderPath)
+        model.exportQuantized(MODELFILES['quantized'], modelFolderPath)
+
+        for backend, filename in MODELFILES.items():
+            filename = os.path.join(modelFolderPath, filename)
+            agent = Agent(backend=backend)
+            agent.loadModel(filename)
+            step = [0]
+
+            def getTrainedAction():
+                agent.getTrainedAction(states[step[0] % 1000])
+                step[0] += 1
+
+            perCall = timeCalls(getTrainedAction, calls)
+            actions = agent.getTrainedActions(allStates).copy()
+
+            if reference is None:
+                reference = actions
+
+            results.append({'backend': backend, 'microseconds': perCall * 1e6, 'bytes': os.path.getsize(filename),
+                            'agreement': float((actions == reference).mean())})
+
+    return results
+
+
+def runBenchmarks(quick=False):
+    """
+    Runs every benchmark
+    :param quick: Use fewer calls for a fast, noisier run
+    :return: Dictionary of the environment and results
+    """
+    scale = 10 if quick else 1
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'torch': torch.__version__,
+            'threads': torch.get_num_threads(),
+        },
+        'playStep': benchmarkPlayStep(20000 // scale),
+        'vecParitySteps': checkVecSnakeGame(2000 // scale),
+        'vecStep': benchmarkVecStep(200000 // scale),
+        'getState': benchmarkGetState(20000 // scale),
+        'getObservations': benchmarkGetObservations(200000 // scale),
+        'trainStep': benchmarkTrainStep(200 // scale),
+        'sampling': benchmarkSampling(200 // scale),
+        'inference': benchmarkInference(5000 // scale),
+    }
+
+
+def printResults(results):
+    """
+    Prints a summary of the results
+    :param results: Dictionary from runBenchmarks
+    """
+    for result in results['playStep']:
+        print('playStep  %4dx%-4d %12.0f steps/s' % (result['width'], result['height'], result['stepsPerSecond']))
+
+    print('VecSnakeGame matched SnakeGame over', results['vecParitySteps'], 'game steps')
+
+    for result in results['vecStep']:
+        print('vecStep   %-5d games %12.0f steps/s' % (result['numGames'], result['stepsPerSecond']))
+
+    for result in results['getState']:
+        print('getState  %4dx%-4d length %-4d %8.2f us' % (result['width'], result['height'], result['length'],
+                                                         result['microseconds']))
+
+    for result in results['getObservations']:
+        print('getObservations %-5d games %8.3f us per game' % (result['numGames'], result['microsecondsPerGame']))
+
+    for result in results['trainStep']:
+        print('%-10s batch %-5d %8.3f ms' % (result['call'], result['batch'], result['milliseconds']))
+
+    for result in results['sampling']:
+        print('sample    %-23s %8.3f ms %12.0f samples/s' % (result['memory'], result['milliseconds'],
+                                                           result['samplesPerSecond']))
+
+    for result in results['inference']:
+        print('inference %-12s %8.2f us %8d bytes %6.1f%% same actions' % (result['backend'], result['microseconds'],
+                                                                       result['bytes'], result['agreement'] * 100))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the game engine and trainer hot paths")
+    parser.add_argument("--quick", action="store_true", help="use fewer calls for a fast, noisier run")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args()
+
+    results = runBenchmarks(quick=args.quick)
+    printResults(results)
+
+    output = args.output
+    if output == None:
+        benchmarkFolderPath = './benchmarks'
+
+        if not os.path.exists(benchmarkFolderPath):
+            os.makedirs(benchmarkFolderPath)
+
+        output = os.path.join(benchmarkFolderPath, time.strftime('%Y%m%d-%H%M%S') + '.json')
+
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=4)
+
+    print('Results written to', output)
@@ -0,0 +1,170 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for saving and resuming training checkpoints
+"""
+
+import os
+import copy
+import random
+import threading
+import numpy as np
+import torch
+
+
+class MemoryTypeError(ValueError):
+    """
+    class   : MemoryTypeError
+    purpose : Raised when a checkpoint's replay memory was saved by a different type of memory than
+              the one it would be restored into
+    """
+
+    def __init__(self, savedType, currentType):
+        """
+        Creates an instance of MemoryTypeError
+        :param savedType: The class name of the memory that saved the checkpoint
+        :param currentType: The class name of the memory it would be restored into
+        """
+        super().__init__('the checkpoint holds a ' + savedType + ' but this run uses a ' + currentType)
+        self.savedType = savedType
+        self.currentType = currentType
+
+
+def memoryType(checkpoint):
+    """
+    Gets the class name of the memory that saved a checkpoint's memory, working it out from the
+    saved arrays for checkpoints from before it was recorded
+    :param checkpoint: The loaded checkpoint
+    :return: The class name
+    """
+    if 'memoryType' in checkpoint:
+        return checkpoint['memoryType']
+
+    if 'linked' in checkpoint['memory']:
+        return 'CompactReplayMemory'
+
+    if 'priorities' in checkpoint['memory']:
+        return 'PrioritizedReplayMemory'
+
+    return 'ReplayMemory'
+
+
+class Checkpointer:
+    """
+    class   : Checkpointer
+    purpose : Snapshots the training state (model, optimizer, counters, random states and optionally
+              the replay memory) and writes it on a background thread with an atomic rename
+    """
+
+    def __init__(self, interval, filename='checkpoint.pth', includeMemory=False):
+        """
+        Creates an instance of Checkpointer
+        :param interval: The number of games between checkpoints
+        :param filename: The filename of the checkpoint in the model folder
+        :param includeMemory: Also save the replay memory
+        """
+        modelFolderPath = './model'
+
+        if not os.path.exists(modelFolderPath):
+            os.makedirs(modelFolderPath)
+
+        self.path = os.path.join(modelFolderPath, filename)
+        self.interval = interval
+        self.includeMemory = includeMemory
+        self.writer = None
+
+    def isDue(self, games):
+        """
+        Checks if a checkpoint should be taken
+        :param games: The number of games played
+        :return: True if a checkpoint is due
+        """
+        return self.interval > 0 and games % self.interval == 0
+
+    def exists(self):
+        """
+        Checks if there is a checkpoint to resume from
+        :return: True if the checkpoint file exists
+        """
+        return os.path.exists(self.path)
+
+    def save(self, agent, game, training):
+        """
+        Takes a snapshot of the training state and writes it in the background
+        :param agent: The agent being trained
+        :param game: The game being played, only saved between games
+        :param training: Dictionary of the training loop counters
+        """
+        # Copy everything now so training can keep changing it while it is written
+        checkpoint = {
+            'model': {key: value.detach().clone() for key, value in agent.model.state_dict().items()},
+            'optimizer': copy.deepcopy(agent.trainer.optimizer.state_dict()),
+            'games': agent.games,
+            'epsilon': agent.epsilon,
+            'training': dict(training),
+            'food': tuple(game.food),
+            'random': {
+                'python': random.getstate(),
+                'numpy': np.random.get_state(),
+                'torch': torch.get_rng_state(),
+                'memory': copy.deepcopy(agent.memory.rng.bit_generator.state),
+                'game': game.rng.getstate(),
+            },
+            'memory': agent.memory.stateDict() if self.includeMemory else None,
+            'memoryType': type(agent.memory).__name__,
+        }
+
+        # Only one write at a time, the previous one has normally finished long ago
+        self.wait()
+        self.writer = threading.Thread(target=self._write, args=(checkpoint, ))
+        self.writer.start()
+
+    def _write(self, checkpoint):
+        """
+        Writes a checkpoint to a temporary file then renames it over the old one
+        :param checkpoint: The checkpoint to write
+        """
+        temporaryPath = self.path + '.tmp'
+        torch.save(checkpoint, temporaryPath)
+        os.replace(temporaryPath, self.path)
+
+    def wait(self):
+        """
+        Waits for the checkpoint being written to finish
+        """
+        if self.writer != None:
+            self.writer.join()
+            self.writer = None
+
+    def load(self, agent, game):
+        """
+        Restores the training state from the checkpoint
+        :param agent: The agent to restore
+        :param game: The game to restore
+        :return: Dictionary of the training loop counters
+        :raises MemoryTypeError: If the checkpoint's replay memory is not the agent's type of memory,
+                                 before anything is restored
+        """
+        checkpoint = torch.load(self.path, weights_only=False)
+
+        if checkpoint['memory'] != None and memoryType(checkpoint) != type(agent.memory).__name__:
+            raise MemoryTypeError(memoryType(checkpoint), type(agent.memory).__name__)
+
+        agent.model.load_state_dict(checkpoint['model'])
+        agent.modelUpdated()
+        agent.trainer.optimizer.load_state_dict(checkpoint['optimizer'])
+        agent.games = checkpoint['games']
+        agent.epsilon = checkpoint['epsilon']
+        game.food = type(game.food)(*checkpoint['food'])
+        game.observation = None
+
+        random.setstate(checkpoint['random']['python'])
+        np.random.set_state(checkpoint['random']['numpy'])
+        torch.set_rng_state(checkpoint['random']['torch'])
+        agent.memory.rng.bit_generator.state = checkpoint['random']['memory']
+        game.rng.setstate(checkpoint['random']['game'])
+
+        if checkpoint['memory'] != None:
+            agent.memory.loadStateDict(checkpoint['memory'])
+
+        return checkpoint['training']
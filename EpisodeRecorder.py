@@ -0,0 +1,171 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for recording games as a seed and action sequence and replaying them
+"""
+
+import os
+import random
+import argparse
+import numpy as np
+
+# Header before the actions of each episode: the food seed, the number of steps and the final score
+HEADER = np.dtype([('seed', '<u8'), ('steps', '<u4'), ('score', '<u4')])
+
+ACTIONS = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+class EpisodeRecorder:
+    """
+    class   : EpisodeRecorder
+    purpose : Appends each game to a binary file as a header (seed, steps, score) followed by one byte
+              per step holding the action index. A step only appends to a bytearray, the file is
+              written once per game
+    """
+
+    def __init__(self, path='./recordings/episodes.bin', seed=None):
+        """
+        Creates an instance of EpisodeRecorder
+        :param path: The file to append the episodes to
+        :param seed: Seed for the sequence of game seeds, None for a random one
+        """
+        folder = os.path.dirname(path)
+
+        if folder != '' and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.path = path
+        self.file = open(path, 'ab')
+        self.seeds = random.Random(seed)
+        self.seed = None
+        self.actions = bytearray()
+
+    def nextSeed(self):
+        """
+        Starts a new episode
+        :return: The seed to start the game with
+        """
+        self.seed = self.seeds.getrandbits(63)
+        self.actions.clear()
+        return self.seed
+
+    def record(self, action):
+        """
+        Records the action of one step
+        :param action: The one hot action [straight, right, left]
+        """
+        self.actions.append(action.index(1))
+
+    def endEpisode(self, score):
+        """
+        Writes the episode to the file
+        :param score: The final score of the game
+        """
+        header = np.array((self.seed, len(self.actions), score), dtype=HEADER)
+        self.file.write(header.tobytes() + self.actions)
+        self.file.flush()
+
+    def close(self):
+        """
+        Closes the file
+        """
+        self.file.close()
+
+
+class EpisodeLog:
+    """
+    class   : EpisodeLog
+    purpose : Reads a file written by EpisodeRecorder through a memory map, an incomplete last
+              episode (from a crash mid write) is ignored
+    """
+
+    def __init__(self, path='./recordings/episodes.bin'):
+        """
+        Creates an instance of EpisodeLog
+        :param path: The file of episodes
+        """
+        size = os.path.getsize(path)
+        self.data = np.memmap(path, dtype=np.uint8, mode='r') if size > 0 else np.zeros(0, dtype=np.uint8)
+        self.offsets = list()
+
+        # Walk the headers to find where each episode starts
+        offset = 0
+        while offset + HEADER.itemsize <= size:
+            steps = int(self.data[offset:offset + HEADER.itemsize].view(HEADER)[0]['steps'])
+
+            if offset + HEADER.itemsize + steps > size:
+                break
+
+            self.offsets.append(offset)
+            offset += HEADER.itemsize + steps
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, episode):
+        """
+        Gets an episode
+        :param episode: The index of the episode
+        :return: The seed, the final score and a read only array of the action indices
+        """
+        offset = self.offsets[episode]
+        header = self.data[offset:offset + HEADER.itemsize].view(HEADER)[0]
+        start = offset + HEADER.itemsize
+
+        return int(header['seed']), int(header['score']), self.data[start:start + int(header['steps'])]
+
+
+def replayEpisode(seed, actions, headless=True):
+    """
+    Plays a recorded episode again through SnakeGame
+    :param seed: The seed the game was started with
+    :param actions: The action indices of every step
+    :param headless: Boolean, false to watch the replay
+    :return: The final score and the number of steps until the game ended
+    """
+    from SnakeGame import SnakeGame
+
+    game = SnakeGame(ai=True, headless=headless, seed=seed)
+    score = 0
+
+    for step, action in enumerate(actions):
+        reward, gameOver, score = game.playStep(ACTIONS[action])
+
+        if gameOver:
+            return score, step + 1
+
+    return score, len(actions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lists, verifies or replays recorded episodes")
+    parser.add_argument("path", nargs="?", default=os.path.join("recordings", "episodes.bin"),
+                        help="file of recorded episodes (default recordings/episodes.bin)")
+    parser.add_argument("--replay", type=int, default=None, metavar="EPISODE", help="watch an episode")
+    parser.add_argument("--verify", action="store_true",
+                        help="replay every episode headless and check it ends with the recorded score")
+    args = parser.parse_args()
+
+    log = EpisodeLog(args.path)
+
+    if args.replay != None:
+        seed, score, actions = log[args.replay]
+        print('Episode', args.replay, 'Seed', seed, 'Steps', len(actions), 'Score', score)
+        replayEpisode(seed, actions, headless=False)
+    elif args.verify:
+        mismatches = 0
+
+        for episode in range(len(log)):
+            seed, score, actions = log[episode]
+            replayedScore, replayedSteps = replayEpisode(seed, actions)
+
+            if replayedScore != score or replayedSteps != len(actions):
+                mismatches += 1
+                print('Episode', episode, 'replayed to score', replayedScore, 'after', replayedSteps,
+                      'steps, recorded', score, 'after', len(actions))
+
+        print(len(log) - mismatches, 'of', len(log), 'episodes replayed exactly')
+    else:
+        for episode in range(len(log)):
+            seed, score, actions = log[episode]
+            print('Episode', episode, 'Seed', seed, 'Steps', len(actions), 'Score', score)
@@ -0,0 +1,145 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for evaluating trained models over many seeded games in parallel
+"""
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+import numpy as np
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# The agent of each worker process, loaded once by initWorker
+workerAgent = None
+
+
+def initWorker(modelPath):
+    """
+    Loads the model in a worker process. Exported .npz files are run with the NumPy backend so the
+    worker never imports torch, and exported .pt files as TorchScript
+    :param modelPath: Path to the model file
+    """
+    global workerAgent
+
+    from Agent import Agent
+
+    if modelPath.endswith('.npz'):
+        workerAgent = Agent(backend='numpy')
+    else:
+        import torch
+
+        # The processes give the parallelism
+        torch.set_num_threads(1)
+        workerAgent = Agent(backend='torchscript' if modelPath.endswith('.pt') else 'torch', inference=True)
+
+    workerAgent.loadModel(os.path.abspath(modelPath))
+    workerAgent.useActionCache(frozen=True)
+
+
+def playGame(seed):
+    """
+    Plays one headless game with the trained actions of the worker's model
+    :param seed: Seed for the food placement
+    :return: Dictionary of the seed, score, number of steps and cause of the game over
+    """
+    from SnakeGame import SnakeGame
+
+    game = SnakeGame(ai=True, headless=True, seed=seed)
+    state = workerAgent.getState(game)
+    done = False
+
+    while not done:
+        finalAction = workerAgent.getTrainedAction(state)
+        state, reward, done, info = game.step(finalAction)
+
+    return {'seed': seed, 'score': info['score'], 'steps': info['frameIteration'], 'cause': info['cause']}
+
+
+def summarise(games, seconds):
+    """
+    Summarises the results of a model's games
+    :param games: List of dictionaries from playGame
+    :param seconds: Wall time taken to play them
+    :return: Dictionary of statistics
+    """
+    scores = np.array([game['score'] for game in games])
+    steps = np.array([game['steps'] for game in games])
+    causes = dict()
+
+    for game in games:
+        causes[game['cause']] = causes.get(game['cause'], 0) + 1
+
+    return {
+        'games': len(games),
+        'meanScore': float(scores.mean()),
+        'stdScore': float(scores.std()),
+        'maxScore': int(scores.max()),
+        'scorePercentiles': {str(p): float(np.percentile(scores, p)) for p in PERCENTILES},
+        'meanSteps': float(steps.mean()),
+        'stepPercentiles': {str(p): float(np.percentile(steps, p)) for p in PERCENTILES},
+        'causes': causes,
+        'gamesPerSecond': len(games) / seconds,
+    }
+
+
+def evaluate(modelPath, games, workers, seed):
+    """
+    Plays seeded games with a model across a process pool
+    :param modelPath: Path to the model file
+    :param games: The number of games
+    :param workers: The number of worker processes
+    :param seed: Seed of the first game, game i uses seed + i
+    :return: Statistics and the list of game results in seed order
+    """
+    seeds = range(seed, seed + games)
+    context = multiprocessing.get_context("spawn")
+
+    start = time.perf_counter()
+    with context.Pool(workers, initializer=initWorker, initargs=(modelPath, )) as pool:
+        results = pool.map(playGame, seeds, chunksize=max(1, games // (4 * workers)))
+    seconds = time.perf_counter() - start
+
+    return summarise(results, seconds), results
+
+
+def printSummary(modelPath, summary):
+    """
+    Prints the statistics of a model
+    :param modelPath: Path to the model file
+    :param summary: Dictionary from summarise
+    """
+    scores = summary['scorePercentiles']
+    causes = ', '.join(cause + ' ' + str(count) for cause, count in sorted(summary['causes'].items()))
+
+    print(modelPath)
+    print('    score  mean %.2f  median %.1f  p10 %.1f  p90 %.1f  max %d' % (
+        summary['meanScore'], scores['50'], scores['10'], scores['90'], summary['maxScore']))
+    print('    steps  mean %.1f  median %.1f' % (summary['meanSteps'], summary['stepPercentiles']['50']))
+    print('    deaths', causes)
+    print('    %.1f games/s' % summary['gamesPerSecond'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluates trained models over many seeded headless games")
+    parser.add_argument("models", nargs="*", default=[os.path.join("model", "model.pth")],
+                        help="model files to evaluate (default model/model.pth), including exported .npz and .pt files")
+    parser.add_argument("--games", type=int, default=100, help="number of games per model")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, game i uses seed + i")
+    parser.add_argument("--output", default=None, help="file to write the JSON results to")
+    args = parser.parse_args()
+
+    output = dict()
+
+    for modelPath in args.models:
+        summary, games = evaluate(modelPath, args.games, args.workers, args.seed)
+        printSummary(modelPath, summary)
+        output[modelPath] = {'summary': summary, 'games': games}
+
+    if args.output != None:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, indent=4)
@@ -0,0 +1,79 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for an index of the free cells on the board
+"""
+
+import random
+
+
+class FreeCells:
+    """
+    class   : FreeCells
+    purpose : Keeps the free cells of a board in an array with a map of each cell's position in it,
+              so cells can be added, removed and randomly chosen in constant time
+    """
+
+    def __init__(self, cols, rows):
+        """
+        Creates an instance of FreeCells with every cell free
+        :param cols: The number of columns on the board
+        :param rows: The number of rows on the board
+        """
+        self.cols = cols
+        self.rows = rows
+
+        # cells holds the free cells, positions[cell] is its index in cells or -1 if not free
+        self.cells = list(range(cols * rows))
+        self.positions = list(range(cols * rows))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def isFree(self, cell):
+        """
+        Checks if a cell is free
+        :param cell: The cell to check
+        :return: True if the cell is free
+        """
+        return self.positions[cell] >= 0
+
+    def remove(self, cell):
+        """
+        Marks a cell as taken by swapping it with the last free cell and removing it
+        :param cell: The cell to remove
+        """
+        position = self.positions[cell]
+
+        if position < 0:
+            return
+
+        last = self.cells.pop()
+
+        if last != cell:
+            self.cells[position] = last
+            self.positions[last] = position
+
+        self.positions[cell] = -1
+
+    def add(self, cell):
+        """
+        Marks a cell as free
+        :param cell: The cell to add
+        """
+        if self.positions[cell] >= 0:
+            return
+
+        self.positions[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self, rng=random):
+        """
+        Chooses a random free cell
+        :param rng: The random number generator to use
+        :return: A free cell or None if the board is full
+        """
+        if len(self.cells) == 0:
+            return None
+
+        return self.cells[rng.randrange(len(self.cells))]
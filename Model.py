@@ -10,6 +10,8 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import numpy as np
+import copy
 import os
 
 
@@ -53,6 +55,49 @@ class LinearQNet(nn.Module):
         filename = os.path.join(modelFolderPath, filename)
         torch.save(self.state_dict(), filename)
 
+    def _exportPath(self, filename, modelFolderPath):
+        """
+        Gets the path of an exported model, creating its folder
+        :param filename: The filename of the exported model
+        :param modelFolderPath: The folder to export to
+        :return: The path of the exported model
+        """
+        if not os.path.exists(modelFolderPath):
+            os.makedirs(modelFolderPath)
+
+        return os.path.join(modelFolderPath, filename)
+
+    def exportNumpy(self, filename='model.npz', modelFolderPath='./model'):
+        """
+        Saves the weights for NumpyQNet, which runs the model without torch
+        :param filename: The filename of the exported model
+        :param modelFolderPath: The folder to export to
+        """
+        # Transposed so each layer is states @ weights + bias
+        with torch.no_grad():
+            np.savez(self._exportPath(filename, modelFolderPath),
+                     weights1=self.linear1.weight.T.contiguous().numpy(), bias1=self.linear1.bias.numpy(),
+                     weights2=self.linear2.weight.T.contiguous().numpy(), bias2=self.linear2.bias.numpy())
+
+    def exportTorchScript(self, filename='model.pt', modelFolderPath='./model'):
+        """
+        Saves the model as a frozen TorchScript module, which runs without the Python model code
+        :param filename: The filename of the exported model
+        :param modelFolderPath: The folder to export to
+        """
+        model = copy.deepcopy(self).eval()
+        torch.jit.save(torch.jit.freeze(torch.jit.script(model)), self._exportPath(filename, modelFolderPath))
+
+    def exportQuantized(self, filename='model_int8.pt', modelFolderPath='./model'):
+        """
+        Saves the model as a TorchScript module with dynamically quantized int8 linear layers, smaller
+        and faster on CPU at a small cost in accuracy
+        :param filename: The filename of the exported model
+        :param modelFolderPath: The folder to export to
+        """
+        model = torch.ao.quantization.quantize_dynamic(copy.deepcopy(self).eval(), {nn.Linear}, dtype=torch.qint8)
+        torch.jit.save(torch.jit.script(model), self._exportPath(filename, modelFolderPath))
+
 
 class QTrainer():
     """
@@ -76,8 +121,12 @@ class QTrainer():
 
     def trainStep(self, state, finalAction, reward, nextState, done):
         """
-        Computes one step of training
-        :return:
+        Computes one step of training from lists (or a single transition)
+        :param state: The state(s) of the game
+        :param finalAction: The one hot action(s) performed
+        :param reward: The reward(s) for the action(s)
+        :param nextState: The next state(s) of the game
+        :param done: If the game(s) finished
         """
         state = torch.tensor(state, dtype=torch.float)
         nextState = torch.tensor(nextState, dtype=torch.float)
@@ -92,23 +141,46 @@ class QTrainer():
             reward = torch.unsqueeze(reward, 0)
             done = (done, )
 
+        done = torch.tensor(done, dtype=torch.bool)
+        action = torch.argmax(finalAction, dim=1)
+
+        self.trainBatch(state, action, reward, nextState, done)
+
+    def trainBatch(self, state, action, reward, nextState, done, weights=None):
+        """
+        Computes one step of training on a batch of tensors
+        :param state: Float tensor of states (batch, inputSize)
+        :param action: Long tensor of action indices (batch,)
+        :param reward: Float tensor of rewards (batch,)
+        :param nextState: Float tensor of next states (batch, inputSize)
+        :param done: Bool tensor of game over flags (batch,)
+        :param weights: Optional float tensor of importance sampling weights (batch,)
+        :return: Tensor of the TD errors of the batch
+        """
         # Get the predicted Q values for the current state
         pred = self.model(state)
 
-        target = pred.clone()
-        for index in range(len(done)):
-            QNew = reward[index]
-
-            if not done[index]:
-                QNew = reward[index] + self.gamma * torch.max(self.model(nextState[index]))
+        # Q-New = Reward + Gamma * max(Next Predicted Q-Value), or just Reward if done
+        # All next states go through the model in one batched forward pass
+        with torch.no_grad():
+            QNext = self.model(nextState).max(dim=1).values
 
-            target[index][torch.argmax(finalAction[index]).item()] = QNew
+        QNew = torch.where(done, reward, reward + self.gamma * QNext)
 
-        # Q-New = Reward + Gamma * max(Next Predicted Q-Value
-        # pred.clone()
         # preds[argmax(FinalAction)] = QNew
+        target = pred.detach().clone()
+        target.scatter_(1, action.unsqueeze(1), QNew.unsqueeze(1))
+
         self.optimizer.zero_grad()
-        loss = self.criterion(target, pred)
+
+        if weights is None:
+            loss = self.criterion(target, pred)
+        else:
+            loss = (weights.unsqueeze(1) * (target - pred) ** 2).mean()
+
         loss.backward()
 
         self.optimizer.step()
+
+        # TD error of the action taken in each transition
+        return QNew - pred.detach().gather(1, action.unsqueeze(1)).squeeze(1)
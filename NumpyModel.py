@@ -0,0 +1,53 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for running an exported model with NumPy, without importing torch
+"""
+
+import numpy as np
+
+
+class NumpyQNet:
+    """
+    class   : NumpyQNet
+    purpose : Runs the forward pass of a LinearQNet exported with LinearQNet.exportNumpy, for
+              inference only. The weights are stored transposed so each layer is one matmul
+    """
+
+    def __init__(self, filename=None):
+        """
+        Creates an instance of NumpyQNet
+        :param filename: The .npz file to load the weights from, None to load them later
+        """
+        self.weights1 = None
+        self.bias1 = None
+        self.weights2 = None
+        self.bias2 = None
+
+        if filename != None:
+            self.load(filename)
+
+    def load(self, filename):
+        """
+        Loads the weights from a file
+        :param filename: The .npz file written by LinearQNet.exportNumpy
+        """
+        with np.load(filename) as weights:
+            self.weights1 = weights['weights1']
+            self.bias1 = weights['bias1']
+            self.weights2 = weights['weights2']
+            self.bias2 = weights['bias2']
+
+    def __call__(self, states):
+        """
+        Returns the Q values of a batch of states
+        :param states: Array of states of shape (batch, inputSize)
+        :return: Float32 array of Q values of shape (batch, outputSize)
+        """
+        hidden = np.asarray(states, dtype=np.float32) @ self.weights1
+        hidden += self.bias1
+        np.maximum(hidden, 0, out=hidden)
+
+        output = hidden @ self.weights2
+        output += self.bias2
+        return output
@@ -6,40 +6,157 @@
     NOTE      : All code based off reference and then modified
 """
 
-import matplotlib.pyplot as plt
 import os
+import atexit
+import threading
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+PLOTINTERVAL = 5.0 # Minimum seconds between renders
+MAXPOINTS = 2000   # Most points drawn per line, longer histories are downsampled
 
 class Plot():
     """
     class   : Plot
-    purpose : For Plots
+    purpose : For Plots. Scores are appended to a CSV log and the plot is rendered on a
+              background thread so training never waits on matplotlib
     """
 
-    def __init__(self):
+    def __init__(self, plotFolderPath='./plots', interval=PLOTINTERVAL, maxPoints=MAXPOINTS, resumeGames=0):
         """
         Creates an instance of Plot and set it up
+        :param plotFolderPath: The folder the log and plot are written to
+        :param interval: Minimum seconds between renders
+        :param maxPoints: Most points drawn per line
+        :param resumeGames: Number of games to keep from an existing log when resuming training
+        """
+        if not os.path.exists(plotFolderPath):
+            os.makedirs(plotFolderPath)
+
+        self.imagePath = os.path.join(plotFolderPath, 'plot.png')
+        self.logPath = os.path.join(plotFolderPath, 'scores.csv')
+        self.interval = interval
+        self.maxPoints = maxPoints
+
+        self.scores = list()
+        self.meanScores = list()
+
+        if resumeGames > 0 and os.path.exists(self.logPath):
+            self._readLog(resumeGames)
+
+        # Rewrite the log so games played after the resumed checkpoint are dropped
+        self.log = open(self.logPath, 'w')
+        self.log.write('game,score,meanScore\n')
+
+        for game in range(len(self.scores)):
+            self.log.write(str(game + 1) + ',' + str(self.scores[game]) + ',' + str(self.meanScores[game]) + '\n')
+
+        # Renders happen on the thread, the lock guards the score lists
+        self.lock = threading.Lock()
+        self.updated = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._renderLoop, daemon=True)
+        self.thread.start()
+
+        # Make sure the last scores are plotted when training is stopped
+        atexit.register(self.close)
+
+    def _readLog(self, games):
+        """
+        Reads the scores of the first games from the log
+        :param games: The number of games to read
+        """
+        with open(self.logPath) as log:
+            next(log)
+
+            for line in log:
+                if len(self.scores) == games:
+                    break
+
+                _, score, meanScore = line.strip().split(',')
+                self.scores.append(int(score))
+                self.meanScores.append(float(meanScore))
+
+    def record(self, score, meanScore):
+        """
+        Records the score and mean score of a game, the plot is rendered later
+        :param score: The score of the game
+        :param meanScore: The mean score so far
+        """
+        with self.lock:
+            self.scores.append(score)
+            self.meanScores.append(meanScore)
+            game = len(self.scores)
+
+        self.log.write(str(game) + ',' + str(score) + ',' + str(meanScore) + '\n')
+        self.updated.set()
+
+    def close(self):
+        """
+        Renders the final plot and stops the background thread
+        """
+        if self.stopped.is_set():
+            return
+
+        self.stopped.set()
+        self.updated.set()
+        self.thread.join()
+        self.log.close()
+
+    def _renderLoop(self):
+        """
+        Renders the plot whenever there are new scores, at most once per interval
         """
-        pass
+        while not self.stopped.is_set():
+            self.updated.wait()
+            self.updated.clear()
+            self._render()
+            self.stopped.wait(self.interval)
+
+        self._render()
 
-    def plot(self, scores, meanScores):
+    def _downsample(self, values):
+        """
+        Picks evenly spaced points of a history, always keeping the last one
+        :param values: The history
+        :return: The game numbers and values of the chosen points
+        """
+        indices = np.arange(len(values))
+
+        if len(values) > self.maxPoints:
+            indices = np.unique(np.linspace(0, len(values) - 1, self.maxPoints).astype(np.int64))
+
+        return indices, np.asarray(values)[indices]
+
+    def _render(self):
         """
         Plots the scores and mean scores of the model during training
-        :param scores: The scores
-        :param meanScore: The mean scores
-        """
-        plt.title('Training...')
-        plt.xlabel('Number of Games')
-        plt.ylabel('Score')
-        plt.ylim(ymin=0)
-        plt.text(len(scores)-1, scores[-1], str(scores[-1]))
-        plt.text(len(meanScores)-1, meanScores[-1], str(meanScores[-1]))
-        plt.plot(scores)
-        plt.plot(meanScores)
-        
-        plotFolderPath = './plots'
+        """
+        with self.lock:
+            scores = list(self.scores)
+            meanScores = list(self.meanScores)
 
-        if not os.path.exists(plotFolderPath):
-            os.makedirs(plotFolderPath)
+        if len(scores) == 0:
+            return
+
+        self.log.flush()
+
+        # A new figure each time so artists never accumulate
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+
+        axes.set_title('Training...')
+        axes.set_xlabel('Number of Games')
+        axes.set_ylabel('Score')
+        axes.plot(*self._downsample(scores))
+        axes.plot(*self._downsample(meanScores))
+        axes.set_ylim(ymin=0)
+        axes.text(len(scores)-1, scores[-1], str(scores[-1]))
+        axes.text(len(meanScores)-1, meanScores[-1], str(meanScores[-1]))
 
-        filename = os.path.join(plotFolderPath, 'plot.png')
-        plt.savefig(filename)
+        # Write then rename so the plot is never seen half written
+        temporaryPath = self.imagePath + '.tmp.png'
+        figure.savefig(temporaryPath)
+        os.replace(temporaryPath, self.imagePath)
@@ -0,0 +1,151 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for timing the phases of the training loop
+"""
+
+import os
+import json
+import time
+import cProfile
+
+PROFILEINTERVAL = 100 # Games between profile summaries
+
+
+class PhaseTimer:
+    """
+    class   : PhaseTimer
+    purpose : Adds up the time spent in each phase of the training loop with a monotonic clock,
+              printing a summary and appending it to a stats file every few games
+    """
+
+    def __init__(self, interval=PROFILEINTERVAL, profileFolderPath='./profiles', startGames=0):
+        """
+        Creates an instance of PhaseTimer
+        :param interval: The number of games in each summary
+        :param profileFolderPath: The folder the stats file is written to
+        :param startGames: The number of games already played, e.g. when resuming
+        """
+        if not os.path.exists(profileFolderPath):
+            os.makedirs(profileFolderPath)
+
+        self.interval = interval
+        self.startGames = startGames
+        self.statsPath = os.path.join(profileFolderPath, 'phases.jsonl')
+        self.totals = dict()
+        self.calls = dict()
+        self.steps = 0
+        self.wallStart = time.perf_counter_ns()
+
+    def start(self):
+        """
+        Starts timing a phase
+        :return: The start time to pass to stop
+        """
+        return time.perf_counter_ns()
+
+    def stop(self, phase, start):
+        """
+        Stops timing a phase and adds the time to its total
+        :param phase: The name of the phase
+        :param start: The time from start
+        """
+        self.totals[phase] = self.totals.get(phase, 0) + time.perf_counter_ns() - start
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def step(self):
+        """
+        Counts a step of the game
+        """
+        self.steps += 1
+
+    def endGame(self, games):
+        """
+        Writes a summary if enough games have been played since the last one
+        :param games: The number of games played
+        """
+        if (games - self.startGames) % self.interval != 0:
+            return
+
+        wallTime = time.perf_counter_ns() - self.wallStart
+        phases = dict()
+
+        for phase, total in self.totals.items():
+            phases[phase] = {
+                'seconds': total / 1e9,
+                'calls': self.calls[phase],
+                'microsecondsPerCall': total / self.calls[phase] / 1e3,
+                'share': total / wallTime,
+            }
+
+        summary = {'games': games, 'steps': self.steps, 'seconds': wallTime / 1e9,
+                   'stepsPerSecond': self.steps / (wallTime / 1e9), 'phases': phases}
+
+        with open(self.statsPath, 'a') as stats:
+            stats.write(json.dumps(summary) + '\n')
+
+        line = 'Profile up to game ' + str(games) + ': ' + '%.0f steps/s' % summary['stepsPerSecond']
+        for phase, stats in sorted(phases.items(), key=lambda item: -item[1]['share']):
+            line += ', %s %.1f%% (%.1f us)' % (phase, 100 * stats['share'], stats['microsecondsPerCall'])
+        print(line)
+
+        self.totals = dict()
+        self.calls = dict()
+        self.steps = 0
+        self.wallStart = time.perf_counter_ns()
+
+
+class NullTimer:
+    """
+    class   : NullTimer
+    purpose : A PhaseTimer that does nothing, used when profiling is off
+    """
+
+    def start(self):
+        return 0
+
+    def stop(self, phase, start):
+        pass
+
+    def step(self):
+        pass
+
+    def endGame(self, games):
+        pass
+
+
+class EpisodeProfiler:
+    """
+    class   : EpisodeProfiler
+    purpose : Runs cProfile over the first few games of training and dumps the stats, which can
+              be read with pstats or snakeviz
+    """
+
+    def __init__(self, episodes, profileFolderPath='./profiles', startGames=0):
+        """
+        Creates an instance of EpisodeProfiler and starts profiling
+        :param episodes: The number of games to profile
+        :param profileFolderPath: The folder the stats are dumped to
+        :param startGames: The number of games already played, e.g. when resuming
+        """
+        if not os.path.exists(profileFolderPath):
+            os.makedirs(profileFolderPath)
+
+        self.episodes = episodes
+        self.startGames = startGames
+        self.path = os.path.join(profileFolderPath, 'train.prof')
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def endGame(self, games):
+        """
+        Stops profiling and dumps the stats once enough games have been played
+        :param games: The number of games played
+        """
+        if self.profile == None or games - self.startGames < self.episodes:
+            return
+
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+        self.profile = None
+        print('Profile of', games - self.startGames, 'games written to', self.path)
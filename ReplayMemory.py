@@ -0,0 +1,423 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for the replay memory of the agent
+"""
+
+import numpy as np
+import torch
+from SumTree import SumTree
+from ActionCache import packStates, unpackStates
+
+
+class ReplayMemory:
+    """
+    class   : ReplayMemory
+    purpose : Stores transitions in preallocated arrays used as a ring buffer, once full the
+              oldest transitions are overwritten (hence forgets old memory)
+    """
+
+    def __init__(self, capacity, stateSize, seed=None):
+        """
+        Creates an instance of ReplayMemory
+        :param capacity: The maximum number of transitions stored
+        :param stateSize: The number of values in a state
+        :param seed: Seed for the sampling random number generator
+        """
+        self.capacity = capacity
+        self.stateSize = stateSize
+        self.rng = np.random.default_rng(seed)
+
+        self._allocate()
+
+        # Write cursor and number of stored transitions
+        self.cursor = 0
+        self.size = 0
+
+    def _allocate(self):
+        """
+        Allocates the arrays the transitions are stored in
+        """
+        self.states = np.zeros((self.capacity, self.stateSize), dtype=np.uint8)
+        self.actions = np.zeros(self.capacity, dtype=np.int8)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.nextStates = np.zeros((self.capacity, self.stateSize), dtype=np.uint8)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, nextState, done):
+        """
+        Adds a transition to the memory
+        :param state: The state of the game
+        :param action: The index of the action chosen
+        :param reward: The reward for the action
+        :param nextState: The next state
+        :param done: If the game has finished
+        :return: The slot the transition was written to
+        """
+        index = self.cursor
+
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.nextStates[index] = nextState
+        self.dones[index] = done
+
+        self.cursor = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+        return index
+
+    def stateDict(self):
+        """
+        Returns a copy of the contents of the memory, for checkpoints
+        :return: Dictionary of the stored transitions and cursor
+        """
+        return {
+            'states': self.states[:self.size].copy(),
+            'actions': self.actions[:self.size].copy(),
+            'rewards': self.rewards[:self.size].copy(),
+            'nextStates': self.nextStates[:self.size].copy(),
+            'dones': self.dones[:self.size].copy(),
+            'cursor': self.cursor,
+        }
+
+    def loadStateDict(self, stateDict):
+        """
+        Restores the contents of the memory from stateDict
+        :param stateDict: Dictionary from stateDict
+        """
+        self.size = len(stateDict['actions'])
+        self.cursor = stateDict['cursor']
+
+        self.states[:self.size] = stateDict['states']
+        self.actions[:self.size] = stateDict['actions']
+        self.rewards[:self.size] = stateDict['rewards']
+        self.nextStates[:self.size] = stateDict['nextStates']
+        self.dones[:self.size] = stateDict['dones']
+
+    def pushBatch(self, states, actions, rewards, nextStates, dones):
+        """
+        Adds a batch of transitions to the memory
+        :param states: Array of states
+        :param actions: Array of action indices
+        :param rewards: Array of rewards
+        :param nextStates: Array of next states
+        :param dones: Array of game over flags
+        :return: The slots the transitions were written to
+        """
+        count = len(actions)
+        indices = (self.cursor + np.arange(count)) % self.capacity
+
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.nextStates[indices] = nextStates
+        self.dones[indices] = dones
+
+        self.cursor = (self.cursor + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+        return indices
+
+    def sampleIndices(self, batchSize):
+        """
+        Chooses the slots for a batch uniformly without replacement
+        :param batchSize: The number of transitions wanted
+        :return: Array of slots, every slot if there are not more than batchSize
+        """
+        if self.size > batchSize:
+            return self.rng.choice(self.size, batchSize, replace=False)
+
+        return np.arange(self.size)
+
+    def sample(self, batchSize):
+        """
+        Samples a batch of transitions
+        :param batchSize: The number of transitions wanted
+        :return: Tensors of states, action indices, rewards, next states and dones
+        """
+        return self.gather(self.sampleIndices(batchSize))
+
+    def gather(self, indices):
+        """
+        Gathers the transitions at the given slots into tensors, sharing memory with the gathered arrays
+        :param indices: The slots to gather
+        :return: Tensors of states, action indices, rewards, next states and dones
+        """
+        return (torch.from_numpy(self.states[indices].astype(np.float32)),
+                torch.from_numpy(self.actions[indices].astype(np.int64)),
+                torch.from_numpy(self.rewards[indices]),
+                torch.from_numpy(self.nextStates[indices].astype(np.float32)),
+                torch.from_numpy(self.dones[indices]))
+
+
+class PrioritizedReplayMemory(ReplayMemory):
+    """
+    class   : PrioritizedReplayMemory
+    purpose : A replay memory that samples transitions in proportion to their TD error, with
+              importance sampling weights to correct for the non uniform sampling
+    """
+
+    def __init__(self, capacity, stateSize, alpha=0.6, beta=0.4, betaIncrement=1e-4, epsilon=1e-5, seed=None):
+        """
+        Creates an instance of PrioritizedReplayMemory
+        :param capacity: The maximum number of transitions stored
+        :param stateSize: The number of values in a state
+        :param alpha: How much the priorities are used (0 is uniform)
+        :param beta: Starting strength of the importance sampling correction, annealed to 1
+        :param betaIncrement: Amount beta grows by every sample
+        :param epsilon: Added to TD errors so no transition has zero priority
+        :param seed: Seed for the sampling random number generator
+        """
+        super().__init__(capacity, stateSize, seed)
+
+        self.alpha = alpha
+        self.beta = beta
+        self.betaIncrement = betaIncrement
+        self.epsilon = epsilon
+
+        # Leaves hold priority ** alpha, new transitions get the highest priority seen
+        self.tree = SumTree(capacity)
+        self.maxPriority = 1.0
+
+    def push(self, state, action, reward, nextState, done):
+        """
+        Adds a transition to the memory with the highest priority seen so far
+        :param state: The state of the game
+        :param action: The index of the action chosen
+        :param reward: The reward for the action
+        :param nextState: The next state
+        :param done: If the game has finished
+        :return: The slot the transition was written to
+        """
+        index = super().push(state, action, reward, nextState, done)
+        self.tree.updateOne(index, self.maxPriority ** self.alpha)
+
+        return index
+
+    def pushBatch(self, states, actions, rewards, nextStates, dones):
+        """
+        Adds a batch of transitions to the memory with the highest priority seen so far
+        :param states: Array of states
+        :param actions: Array of action indices
+        :param rewards: Array of rewards
+        :param nextStates: Array of next states
+        :param dones: Array of game over flags
+        :return: The slots the transitions were written to
+        """
+        indices = super().pushBatch(states, actions, rewards, nextStates, dones)
+        self.tree.update(indices, np.full(len(indices), self.maxPriority ** self.alpha))
+
+        return indices
+
+    def stateDict(self):
+        """
+        Returns a copy of the contents of the memory and priorities, for checkpoints
+        :return: Dictionary of the stored transitions, cursor and priorities
+        """
+        stateDict = super().stateDict()
+        stateDict['priorities'] = self.tree.get(np.arange(self.size))
+        stateDict['maxPriority'] = self.maxPriority
+        stateDict['beta'] = self.beta
+
+        return stateDict
+
+    def loadStateDict(self, stateDict):
+        """
+        Restores the contents of the memory and priorities from stateDict
+        :param stateDict: Dictionary from stateDict
+        """
+        super().loadStateDict(stateDict)
+
+        # Memories saved without priorities start at the highest priority
+        priorities = stateDict.get('priorities', np.full(self.size, self.maxPriority ** self.alpha))
+
+        if self.size > 0:
+            self.tree.update(np.arange(self.size), priorities)
+
+        self.maxPriority = stateDict.get('maxPriority', self.maxPriority)
+        self.beta = stateDict.get('beta', self.beta)
+
+    def sampleIndices(self, batchSize):
+        """
+        Chooses the slots for a batch in proportion to their priority, one from each equal
+        segment of the total priority
+        :param batchSize: The number of transitions wanted
+        :return: Array of slots
+        """
+        batchSize = min(batchSize, self.size)
+        segment = self.tree.total() / batchSize
+        values = (np.arange(batchSize) + self.rng.random(batchSize)) * segment
+
+        # Rounding can walk past the last stored transition
+        return np.minimum(self.tree.find(values), self.size - 1)
+
+    def sample(self, batchSize):
+        """
+        Samples a batch of transitions in proportion to their priority
+        :param batchSize: The number of transitions wanted
+        :return: Tensors of states, action indices, rewards, next states and dones, the slots
+                 sampled and a tensor of importance sampling weights
+        """
+        indices = self.sampleIndices(batchSize)
+
+        probabilities = self.tree.get(indices) / self.tree.total()
+        weights = (self.size * probabilities) ** -self.beta
+        weights /= weights.max()
+
+        self.beta = min(1.0, self.beta + self.betaIncrement)
+
+        return self.gather(indices) + (indices, torch.from_numpy(weights.astype(np.float32)))
+
+    def updatePriorities(self, indices, tdErrors):
+        """
+        Sets the priorities of sampled transitions from their TD errors
+        :param indices: The slots that were sampled
+        :param tdErrors: The TD errors of those transitions
+        """
+        priorities = np.abs(np.asarray(tdErrors, dtype=np.float64)) + self.epsilon
+
+        self.maxPriority = max(self.maxPriority, priorities.max())
+        self.tree.update(indices, priorities ** self.alpha)
+
+
+class CompactReplayMemory(ReplayMemory):
+    """
+    class   : CompactReplayMemory
+    purpose : A replay memory storing each transition in 6 bytes: the state packed into a uint16,
+              the action index, the reward as an int8, the done flag and a flag saying the next
+              state is the state in the following slot. Transitions must be pushed in the order
+              they were played, next states that do not match the following state (or belong to
+              the latest transition) are kept on the side
+    """
+
+    def _allocate(self):
+        """
+        Allocates the arrays the transitions are stored in
+        """
+        self.states = np.zeros(self.capacity, dtype=np.uint16)
+        self.actions = np.zeros(self.capacity, dtype=np.uint8)
+        self.rewards = np.zeros(self.capacity, dtype=np.int8)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+        self.linked = np.zeros(self.capacity, dtype=bool)
+
+        # Next states not stored in the following slot, by slot
+        self.unlinkedNext = dict()
+
+        # The slot of the latest transition if it still needs its next state linked
+        self.pendingSlot = None
+        self.pendingNext = 0
+
+    def push(self, state, action, reward, nextState, done):
+        """
+        Adds a transition to the memory
+        :param state: The state of the game
+        :param action: The index of the action chosen
+        :param reward: The reward for the action
+        :param nextState: The next state
+        :param done: If the game has finished
+        :return: The slot the transition was written to
+        """
+        index = self.cursor
+        packed = packStates(state)
+
+        # Link the previous transition to this state if it was its next state
+        if self.pendingSlot != None:
+            if self.pendingNext == packed:
+                self.linked[self.pendingSlot] = True
+            else:
+                self.unlinkedNext[self.pendingSlot] = self.pendingNext
+            self.pendingSlot = None
+
+        self.states[index] = packed
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.dones[index] = done
+        self.linked[index] = False
+        self.unlinkedNext.pop(index, None)
+
+        # The next state of a finished game is never used, so it is not kept
+        if not done:
+            self.pendingSlot = index
+            self.pendingNext = packStates(nextState)
+
+        self.cursor = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+        return index
+
+    def pushBatch(self, states, actions, rewards, nextStates, dones):
+        """
+        Adds a batch of transitions to the memory, in order
+        :param states: Array of states
+        :param actions: Array of action indices
+        :param rewards: Array of rewards
+        :param nextStates: Array of next states
+        :param dones: Array of game over flags
+        :return: The slots the transitions were written to
+        """
+        return np.array([self.push(*transition) for transition in zip(states, actions, rewards, nextStates, dones)],
+                        dtype=np.int64)
+
+    def gather(self, indices):
+        """
+        Gathers the transitions at the given slots into tensors, unpacking the states
+        :param indices: The slots to gather
+        :return: Tensors of states, action indices, rewards, next states and dones
+        """
+        indices = np.asarray(indices)
+        states = self.states[indices]
+        dones = self.dones[indices]
+
+        # Next states come from the following slot, finished games just repeat the state
+        nextStates = np.where(self.linked[indices], self.states[(indices + 1) % self.capacity], states)
+
+        for position in np.flatnonzero(~self.linked[indices] & ~dones):
+            index = indices[position]
+            if index == self.pendingSlot:
+                nextStates[position] = self.pendingNext
+            else:
+                nextStates[position] = self.unlinkedNext[index]
+
+        return (torch.from_numpy(unpackStates(states).astype(np.float32)),
+                torch.from_numpy(self.actions[indices].astype(np.int64)),
+                torch.from_numpy(self.rewards[indices].astype(np.float32)),
+                torch.from_numpy(unpackStates(nextStates).astype(np.float32)),
+                torch.from_numpy(dones))
+
+    def stateDict(self):
+        """
+        Returns a copy of the contents of the memory, for checkpoints
+        :return: Dictionary of the stored transitions and cursor
+        """
+        return {
+            'states': self.states[:self.size].copy(),
+            'actions': self.actions[:self.size].copy(),
+            'rewards': self.rewards[:self.size].copy(),
+            'dones': self.dones[:self.size].copy(),
+            'linked': self.linked[:self.size].copy(),
+            'unlinkedNext': dict(self.unlinkedNext),
+            'pendingSlot': self.pendingSlot,
+            'pendingNext': self.pendingNext,
+            'cursor': self.cursor,
+        }
+
+    def loadStateDict(self, stateDict):
+        """
+        Restores the contents of the memory from stateDict
+        :param stateDict: Dictionary from stateDict
+        """
+        self.size = len(stateDict['actions'])
+        self.cursor = stateDict['cursor']
+
+        self.states[:self.size] = stateDict['states']
+        self.actions[:self.size] = stateDict['actions']
+        self.rewards[:self.size] = stateDict['rewards']
+        self.dones[:self.size] = stateDict['dones']
+        self.linked[:self.size] = stateDict['linked']
+        self.unlinkedNext = dict(stateDict['unlinkedNext'])
+        self.pendingSlot = stateDict['pendingSlot']
+        self.pendingNext = stateDict['pendingNext']
@@ -6,12 +6,51 @@
     NOTE      : All code based off reference and then modified
 """
 
-from collections import namedtuple
+from collections import namedtuple, deque
 from Direction import Direction
+from FreeCells import FreeCells
+import random
 
 Point = namedtuple('Point', 'x, y')
 
 
+class BodyView:
+    """
+    class   : BodyView
+    purpose : A read only view of the body of a snake, head first
+    """
+
+    def __init__(self, body, occupancy):
+        """
+        Creates an instance of BodyView
+        :param body: The deque holding the body of the snake
+        :param occupancy: The occupancy counts of the snake
+        """
+        self._body = body
+        self._occupancy = occupancy
+
+    def __len__(self):
+        return len(self._body)
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def __reversed__(self):
+        return reversed(self._body)
+
+    def __contains__(self, point):
+        return point in self._occupancy
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._body)[index]
+
+        return self._body[index]
+
+    def __repr__(self):
+        return 'BodyView(' + repr(list(self._body)) + ')'
+
+
 class Snake:
     """
     class   : Snake
@@ -25,17 +64,32 @@ class Snake:
         :param blockSize: Size of each block
         """
         self.BLOCKSIZE = blockSize
+        self.cols = width // blockSize
+        self.rows = height // blockSize
         self.direction = Direction.RIGHT
-        self.head = Point(width / 2, height / 2)
-        self.body = [self.head, Point(self.head.x - self.BLOCKSIZE, self.head.y),
-                     Point(self.head.x - (2 * self.BLOCKSIZE), self.head.y)]
+
+        # Start in the middle cell so the snake stays aligned with the food grid
+        self.head = Point((self.cols // 2) * blockSize, (self.rows // 2) * blockSize)
+        self.body = deque([self.head, Point(self.head.x - self.BLOCKSIZE, self.head.y),
+                           Point(self.head.x - (2 * self.BLOCKSIZE), self.head.y)])
+
+        # Counts of body segments on each point, for constant time collision checks
+        self.occupancy = dict()
+
+        # Cells not covered by the snake, for constant time food placement
+        self.freeCells = FreeCells(self.cols, self.rows)
+
+        for point in self.body:
+            self._addPoint(point)
+
+        self.bodyView = BodyView(self.body, self.occupancy)
 
     def getBody(self):
         """
-        Returns the body of the snake
+        Returns a read only view of the body of the snake
         :return: Body of the snake
         """
-        return self.body
+        return self.bodyView
 
     def setDirection(self, direction):
         """
@@ -76,7 +130,8 @@ class Snake:
         """
         Inserts the head into the snakes body to move it
         """
-        self.body.insert(0, self.head)
+        self.body.appendleft(self.head)
+        self._addPoint(self.head)
 
     def getHead(self):
         """
@@ -89,4 +144,81 @@ class Snake:
         """
         Removes the lagging parts of the snake
         """
-        self.body.pop()
\ No newline at end of file
+        self._removePoint(self.body.pop())
+
+    def _toCell(self, point):
+        """
+        Converts a point to its cell index on the board
+        :param point: The point to convert
+        :return: The cell index or None if the point is off the board
+        """
+        col = int(point.x) // self.BLOCKSIZE
+        row = int(point.y) // self.BLOCKSIZE
+
+        if point.x < 0 or point.y < 0 or col >= self.cols or row >= self.rows:
+            return None
+
+        return row * self.cols + col
+
+    def _addPoint(self, point):
+        """
+        Adds a body segment on a point to the occupancy counts and free cells
+        :param point: The point of the segment
+        """
+        count = self.occupancy.get(point, 0)
+        self.occupancy[point] = count + 1
+
+        if count == 0:
+            cell = self._toCell(point)
+            if cell != None:
+                self.freeCells.remove(cell)
+
+    def _removePoint(self, point):
+        """
+        Removes a body segment on a point from the occupancy counts and free cells
+        :param point: The point of the segment
+        """
+        count = self.occupancy[point] - 1
+
+        if count == 0:
+            del self.occupancy[point]
+
+            cell = self._toCell(point)
+            if cell != None:
+                self.freeCells.add(cell)
+        else:
+            self.occupancy[point] = count
+
+    def getRandomFreePoint(self, rng=random):
+        """
+        Chooses a random point on the board that the snake is not on
+        :param rng: The random number generator to use
+        :return: A free point or None if the snake fills the board
+        """
+        cell = self.freeCells.choice(rng)
+
+        if cell == None:
+            return None
+
+        return Point((cell % self.cols) * self.BLOCKSIZE, (cell // self.cols) * self.BLOCKSIZE)
+
+    def isOccupied(self, point):
+        """
+        Checks if any part of the snake is on a point
+        :param point: The point to check
+        :return: True if the snake is on the point
+        """
+        return point in self.occupancy
+
+    def hitsBody(self, point):
+        """
+        Checks if a point collides with the body, not counting the leading segment
+        :param point: The point to check
+        :return: True if the point is on the body behind the leading segment
+        """
+        count = self.occupancy.get(point, 0)
+
+        if count > 0 and point == self.body[0]:
+            count -= 1
+
+        return count > 0
@@ -7,7 +7,6 @@
 from collections import namedtuple
 from Direction import Direction
 from Snake import Snake
-import numpy as np
 
 Point = namedtuple('Point', 'x, y')
 
@@ -24,11 +23,12 @@ class SnakeAI(Snake):
 
         clockWise = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
         index = clockWise.index(self.direction)
+        action = list(action)
 
-        if np.array_equal(action, [1, 0, 0]):
+        if action == [1, 0, 0]:
             # No Change
             newDirection = clockWise[index]
-        elif np.array_equal(action, [0, 1, 0]):
+        elif action == [0, 1, 0]:
             # Right turn
             nextIndex = (index + 1) % 4
             newDirection = clockWise[nextIndex]
@@ -6,15 +6,16 @@
     NOTE      : All code based off reference and then modified
 """
 
-import pygame as pyg
 from StateFactory import StateFactory
 from Direction import Direction
-import random
 from collections import namedtuple
+import numpy as np
+import random
 
 # Inital Constant Setup
-pyg.init()
-font = pyg.font.Font('arial.ttf', 25)
+# NOTE: pygame is only imported and initialised, and the font loaded, once a display is created
+pyg = None
+font = None
 Point = namedtuple('Point', 'x, y')
 
 BLACK = (0, 0, 0)
@@ -26,6 +27,12 @@ SEAFOAMGREEN = (160, 200, 180)
 BLOCKSIZE = 20
 SPEED = 20
 
+# Directions in clockwise order, used for relative turns
+CLOCKWISE = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
+
+# Step in blocks for each direction
+OFFSETS = {Direction.RIGHT: (1, 0), Direction.DOWN: (0, 1), Direction.LEFT: (-1, 0), Direction.UP: (0, -1)}
+
 
 class SnakeGame:
     """
@@ -33,40 +40,70 @@ class SnakeGame:
     purpose : Contains functionality for a game of snake
     """
 
-    def __init__(self, width=640, height=640, ai=False):
+    def __init__(self, width=640, height=640, ai=False, headless=False, seed=None):
         """
         Init
         :param width: width of the screen
         :param height: height of the screen
+        :param ai: Boolean, true if AI controlled
+        :param headless: Boolean, true to run without a display or frame pacing
+        :param seed: Seed for the food placement, None for a random one
         """
         # Set up size
         self.width = width
         self.height = height
+        self.headless = headless
+        self.rng = random.Random(seed)
         self.state = StateFactory(ai, self, BLOCKSIZE).makeState()
 
         # Initialise display
-        self.display = pyg.display.set_mode((self.width, self.height))
-        pyg.display.set_caption("Snack")
-        self.clock = pyg.time.Clock()
+        self.display = None
+        self.clock = None
+
+        # What is on the display, so only the cells that change are redrawn
+        self.redrawAll = True
+        self.drawnTail = None
+        self.drawnFood = None
+        self.drawnScore = None
+        self.scoreSurface = None
+        self.scoreRect = None
+
+        if not self.headless:
+            self._initDisplay()
 
         # Init snake and state
         self.food = None
+        self.observation = None
         self.state.reset()
 
         # Init user input
         self.ui = UserInputFactory(ai).makeUserInput()
 
-    def _placeFood(self):
+    def _initDisplay(self):
         """
-        Places a piece of food in the game
+        Imports and initialises pygame, the font and the display window
         """
-        x = random.randint(0, (self.width - BLOCKSIZE) // BLOCKSIZE) * BLOCKSIZE
-        y = random.randint(0, (self.width - BLOCKSIZE) // BLOCKSIZE) * BLOCKSIZE
+        global pyg, font
+
+        import pygame as pyg
+        pyg.init()
+
+        if font == None:
+            font = pyg.font.Font('arial.ttf', 25)
+
+        self.display = pyg.display.set_mode((self.width, self.height))
+        pyg.display.set_caption("Snack")
+        self.clock = pyg.time.Clock()
 
-        self.food = Point(x, y)
+    def _placeFood(self):
+        """
+        Places a piece of food on a random cell the snake is not on
+        """
+        food = self.state.snake.getRandomFreePoint(self.rng)
 
-        if self.food in self.state.snake.getBody():
-            self._placeFood()
+        # Leave the food where it is if the snake fills the whole board
+        if food != None:
+            self.food = food
 
     def playStep(self, action=None):
         """
@@ -75,6 +112,7 @@ class SnakeGame:
         """
         # Increment frame iteration
         self.state.frameIteration += 1
+        self.observation = None
         self.state.resetReward()
 
         # If ai controlled no user input hence just passes
@@ -91,9 +129,10 @@ class SnakeGame:
         # Place more food or move
         self.state.processFood()
 
-        # Update UI and clock
-        self._updateUI()
-        self.clock.tick(SPEED)
+        # Update UI and clock (skipped when headless)
+        if not self.headless:
+            self._updateUI()
+            self.clock.tick(SPEED)
 
         # Return game over and score
         return self.state.getGameOverAndScore()
@@ -107,18 +146,41 @@ class SnakeGame:
             point = self.state.snake.getHead()
 
         output = False
-        snakeBody = self.state.snake.getBody()
 
         if point.x > self.width - BLOCKSIZE or point.x < 0 or point.y > self.height - BLOCKSIZE or point.y < 0:
             output = True
-        if point in snakeBody[1:]:
+        if self.state.snake.hitsBody(point):
             output = True
 
         return output
 
     def _updateUI(self):
         """
-        Updates the display, drawing everything to it
+        Updates the display, redrawing only the cells that changed since the last frame
+        """
+        if self.redrawAll:
+            self._redrawAll()
+            return
+
+        snake = self.state.snake
+        body = snake.getBody()
+
+        # Only the new head, the vacated tail and the old and new food can change in one step
+        dirty = {snake.getHead(), self.drawnTail, self.drawnFood, self.food}
+        rects = [self._drawCell(point) for point in dirty]
+
+        self.drawnTail = body[-1]
+        self.drawnFood = self.food
+
+        # Redraw the score if it changed or a cell was drawn over it
+        if self.drawnScore != self.state.score or self.scoreRect.collidelist(rects) != -1:
+            rects.append(self._drawScore())
+
+        pyg.display.update(rects)
+
+    def _redrawAll(self):
+        """
+        Draws everything to the display
         """
         snakeBody = self.state.snake.getBody()
 
@@ -127,23 +189,125 @@ class SnakeGame:
 
         # Draw snake
         for pt in snakeBody:
-            pyg.draw.rect(self.display, GREEN2, pyg.Rect(pt.x, pt.y, BLOCKSIZE, BLOCKSIZE))
-            pyg.draw.rect(self.display, GREEN1, pyg.Rect(pt.x + 4, pt.y + 4, 12, 12))
+            self._drawSegment(pt)
 
         # Draw food
         pyg.draw.rect(self.display, ORANGE, pyg.Rect(self.food.x, self.food.y, BLOCKSIZE, BLOCKSIZE))
 
-        # Draw Score
-        text = font.render("Score: " + str(self.state.score), True, BLACK)
-        self.display.blit(text, [0, 0])
+        self.drawnTail = snakeBody[-1]
+        self.drawnFood = self.food
+        self.redrawAll = False
+
+        self.drawnScore = None
+        self._drawScore()
         pyg.display.flip()
 
-    def reset(self):
+    def _drawSegment(self, point):
+        """
+        Draws one segment of the snake
+        :param point: The point of the segment
+        """
+        pyg.draw.rect(self.display, GREEN2, pyg.Rect(point.x, point.y, BLOCKSIZE, BLOCKSIZE))
+        pyg.draw.rect(self.display, GREEN1, pyg.Rect(point.x + 4, point.y + 4, 12, 12))
+
+    def _drawCell(self, point):
+        """
+        Draws whatever is now on a cell
+        :param point: The point of the cell
+        :return: The rect of the cell
+        """
+        rect = pyg.Rect(point.x, point.y, BLOCKSIZE, BLOCKSIZE)
+        self.display.fill(SEAFOAMGREEN, rect)
+
+        if self.state.snake.isOccupied(point):
+            self._drawSegment(point)
+        elif point == self.food:
+            pyg.draw.rect(self.display, ORANGE, rect)
+
+        return rect
+
+    def _drawScore(self):
+        """
+        Draws the score over the cells under it, rendering the text only when the score changes
+        :return: The rect covering the old and new score text
+        """
+        if self.drawnScore != self.state.score:
+            self.drawnScore = self.state.score
+            self.scoreSurface = font.render("Score: " + str(self.state.score), True, BLACK)
+
+        rect = self.scoreSurface.get_rect()
+        if self.scoreRect != None:
+            rect = rect.union(self.scoreRect)
+        self.scoreRect = self.scoreSurface.get_rect()
+
+        # Redraw the cells under the text before drawing it on top
+        for x in range(0, rect.right, BLOCKSIZE):
+            for y in range(0, rect.bottom, BLOCKSIZE):
+                self._drawCell(Point(x, y))
+
+        self.display.blit(self.scoreSurface, [0, 0])
+
+        return pyg.Rect(0, 0, -(-rect.right // BLOCKSIZE) * BLOCKSIZE, -(-rect.bottom // BLOCKSIZE) * BLOCKSIZE)
+
+    def reset(self, seed=None):
         """
         Resets the game state
+        :param seed: Seed for the food placement of the new game, None carries on the current sequence
         """
+        if seed != None:
+            self.rng.seed(seed)
+
+        self.observation = None
+        self.redrawAll = True
         self.state.reset()
 
+    def step(self, action):
+        """
+        Plays one step of an AI controlled game
+        :param action: The one hot action [straight, right, left]
+        :return: The observation after the step, the reward, the game over status and a dictionary
+                 with the score, frame iteration and cause of the game over
+        """
+        reward, gameOver, score = self.playStep(action)
+        info = {'score': score, 'frameIteration': self.state.frameIteration, 'cause': self.state.gameOverCause}
+
+        return self.getObservation(), reward, gameOver, info
+
+    def getObservation(self):
+        """
+        Gets the observation of the current frame, computed once and cached until the next step or reset
+        :return: Read only bool array of danger straight/right/left, the direction (left, right, up,
+                 down) and where the food is (left, right, up, down)
+        """
+        if self.observation is None:
+            snake = self.state.snake
+            head = snake.getHead()
+            direction = snake.getDirection()
+            index = CLOCKWISE.index(direction)
+
+            # The points straight ahead, to the right and to the left of the head
+            dangers = list()
+            for turn in (0, 1, -1):
+                dx, dy = OFFSETS[CLOCKWISE[(index + turn) % 4]]
+                dangers.append(self.collision(Point(head.x + dx * BLOCKSIZE, head.y + dy * BLOCKSIZE)))
+
+            self.observation = np.array(dangers + [
+                # Move Direction
+                direction == Direction.LEFT,
+                direction == Direction.RIGHT,
+                direction == Direction.UP,
+                direction == Direction.DOWN,
+
+                # Food Location
+                self.food.x < head.x,  # food left
+                self.food.x > head.x,  # food right
+                self.food.y < head.y,  # food up
+                self.food.y > head.y   # food down
+            ], dtype=bool)
+            self.observation.flags.writeable = False
+
+        return self.observation
+
 
 class UserInput():
     """
@@ -0,0 +1,96 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for a sum tree used for prioritized sampling
+"""
+
+import numpy as np
+
+
+class SumTree:
+    """
+    class   : SumTree
+    purpose : A binary tree stored in an array where each node holds the sum of its children, so
+              values can be updated and sampled in proportion to their size in O(log n).
+              Batches of updates and samples walk the tree one level at a time with NumPy.
+    """
+
+    def __init__(self, capacity):
+        """
+        Creates an instance of SumTree with every leaf set to 0
+        :param capacity: The number of leaves
+        """
+        self.capacity = capacity
+
+        # Leaves are padded to a power of two so every leaf is at the same depth.
+        # The root is at index 1 and the children of node n are at 2n and 2n + 1
+        self.leafOffset = 1 << max(0, (capacity - 1).bit_length())
+        self.tree = np.zeros(2 * self.leafOffset, dtype=np.float64)
+
+    def total(self):
+        """
+        Returns the sum of all leaves
+        :return: The total
+        """
+        return self.tree[1]
+
+    def get(self, indices):
+        """
+        Returns the values of leaves
+        :param indices: The leaf indices
+        :return: The values of the leaves
+        """
+        return self.tree[np.asarray(indices) + self.leafOffset]
+
+    def updateOne(self, index, value):
+        """
+        Sets the value of one leaf and updates the sums above it, walking up with plain ints as a
+        level by level NumPy walk costs far more for a single leaf
+        :param index: The leaf index
+        :param value: The new value of the leaf
+        """
+        tree = self.tree
+        node = int(index) + self.leafOffset
+        tree[node] = value
+
+        node //= 2
+        while node >= 1:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def update(self, indices, values):
+        """
+        Sets the values of a batch of leaves and updates the sums above them
+        :param indices: The leaf indices
+        :param values: The new values of the leaves
+        """
+        nodes = np.asarray(indices) + self.leafOffset
+        self.tree[nodes] = values
+
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+            if nodes[0] == 1:
+                break
+
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """
+        Finds the leaves where the running sum of the leaves reaches each value
+        :param values: Values between 0 and the total
+        :return: The leaf indices
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+
+        while nodes[0] < self.leafOffset:
+            left = 2 * nodes
+            leftSums = self.tree[left]
+
+            goRight = values > leftSums
+            values = np.where(goRight, values - leftSums, values)
+            nodes = np.where(goRight, left + 1, left)
+
+        return nodes - self.leafOffset
@@ -0,0 +1,226 @@
+"""
+    Author    : Milan Marocchi
+    Date      : 18/10/2026
+    Purpose   : Contains code for a vectorized (batched) snake game backed by NumPy arrays
+"""
+
+import numpy as np
+from collections import namedtuple
+from Direction import Direction
+from SnakeGame import BLOCKSIZE, CLOCKWISE
+
+Point = namedtuple('Point', 'x, y')
+
+# Cell offsets for each clockwise direction index
+DX = np.array([1, 0, -1, 0], dtype=np.int32)
+DY = np.array([0, 1, 0, -1], dtype=np.int32)
+
+# Change in direction index for each action index [straight, right, left]
+TURNS = np.array([0, 1, -1], dtype=np.int8)
+
+
+class VecSnakeGame:
+    """
+    class   : VecSnakeGame
+    purpose : Holds many AI controlled games of snake in NumPy arrays and steps them all at once.
+              Follows the same rules as SnakeAI.move, AIState.checkGameOver and AIState.processFood.
+              All positions are stored in cells (pixels // BLOCKSIZE).
+    """
+
+    def __init__(self, numGames, width=640, height=640, seed=None):
+        """
+        Creates an instance of VecSnakeGame
+        :param numGames: The number of games to run at once
+        :param width: width of each game board in pixels
+        :param height: height of each game board in pixels
+        :param seed: Seed for the food placement random number generator
+        """
+        self.numGames = numGames
+        self.width = width
+        self.height = height
+        self.cols = width // BLOCKSIZE
+        self.rows = height // BLOCKSIZE
+        self.numCells = self.cols * self.rows
+
+        # The body can hold every cell plus the newly inserted head
+        self.capacity = self.numCells + 1
+
+        self.rng = np.random.default_rng(seed)
+        self._games = np.arange(numGames)
+
+        # Snake state
+        self.headX = np.zeros(numGames, dtype=np.int32)
+        self.headY = np.zeros(numGames, dtype=np.int32)
+        self.direction = np.zeros(numGames, dtype=np.int8)
+
+        # Body ring buffers of flat cell indices (y * cols + x), head at bodyStart
+        self.body = np.zeros((numGames, self.capacity), dtype=np.int32)
+        self.bodyStart = np.zeros(numGames, dtype=np.int64)
+        self.length = np.zeros(numGames, dtype=np.int64)
+
+        # Occupancy grids of flat cell indices
+        self.grid = np.zeros((numGames, self.numCells), dtype=bool)
+
+        # Game state
+        self.foodX = np.zeros(numGames, dtype=np.int32)
+        self.foodY = np.zeros(numGames, dtype=np.int32)
+        self.score = np.zeros(numGames, dtype=np.int64)
+        self.frameIteration = np.zeros(numGames, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Resets games to their starting state
+        :param mask: Boolean array of the games to reset, None resets all of them
+        """
+        if mask is None:
+            games = self._games
+        else:
+            games = np.flatnonzero(mask)
+
+        if len(games) == 0:
+            return
+
+        startX = self.cols // 2
+        startY = self.rows // 2
+
+        self.headX[games] = startX
+        self.headY[games] = startY
+        self.direction[games] = CLOCKWISE.index(Direction.RIGHT)
+
+        # Head followed by two segments to its left, as in Snake.__init__
+        self.grid[games] = False
+        self.bodyStart[games] = 0
+        self.length[games] = 3
+
+        for segment in range(3):
+            cell = startY * self.cols + (startX - segment)
+            self.body[games, segment] = cell
+            self.grid[games, cell] = True
+
+        self.score[games] = 0
+        self.frameIteration[games] = 0
+        self._placeFood(games)
+
+    def _placeFood(self, games):
+        """
+        Places a piece of food on a random free cell for each of the given games
+        :param games: Indices of the games that need food
+        """
+        if len(games) == 0:
+            return
+
+        # Pick the free cell with the highest random key, uniform over free cells
+        keys = self.rng.random((len(games), self.numCells))
+        keys[self.grid[games]] = -1.0
+        cells = keys.argmax(axis=1)
+
+        self.foodX[games] = cells % self.cols
+        self.foodY[games] = cells // self.cols
+
+    def step(self, actions):
+        """
+        Plays one step of every game, resetting the games that finish
+        :param actions: Action indices [straight, right, left] of shape (numGames,)
+                        or one hot actions of shape (numGames, 3)
+        :return: The rewards, game over flags and scores (before any reset) of every game
+        """
+        actions = np.asarray(actions)
+
+        if actions.ndim == 2:
+            # Same as SnakeAI.move: [1, 0, 0] straight, [0, 1, 0] right, anything else left
+            straight = (actions == (1, 0, 0)).all(axis=1)
+            right = (actions == (0, 1, 0)).all(axis=1)
+            actions = np.where(straight, 0, np.where(right, 1, 2))
+
+        games = self._games
+        self.frameIteration += 1
+
+        # Turn and move the heads
+        self.direction = (self.direction + TURNS[actions]) % 4
+        self.headX = self.headX + DX[self.direction]
+        self.headY = self.headY + DY[self.direction]
+
+        outOfBounds = (self.headX < 0) | (self.headX >= self.cols) | (self.headY < 0) | (self.headY >= self.rows)
+        cells = np.where(outOfBounds, 0, self.headY * self.cols + self.headX)
+
+        # The tail has not moved yet, so it still counts as body (as in SnakeGame.collision)
+        hitBody = self.grid[games, cells] & ~outOfBounds
+        timeout = self.frameIteration > 100 * (self.length + 1)
+        dones = outOfBounds | hitBody | timeout
+
+        rewards = np.where(dones, -10, 0)
+        ate = (self.headX == self.foodX) & (self.headY == self.foodY)
+        rewards[ate] = 10
+        self.score += ate
+
+        # Insert the heads into the bodies
+        live = ~dones
+        self.bodyStart = (self.bodyStart - 1) % self.capacity
+        self.body[games, self.bodyStart] = cells
+        self.length += 1
+        self.grid[games[live], cells[live]] = True
+
+        # Pop the tails of the snakes that did not eat
+        popped = games[live & ~ate]
+        tails = (self.bodyStart[popped] + self.length[popped] - 1) % self.capacity
+        self.grid[popped, self.body[popped, tails]] = False
+        self.length[popped] -= 1
+
+        self._placeFood(games[live & ate])
+
+        scores = self.score.copy()
+        self.reset(dones)
+
+        return rewards, dones, scores
+
+    def getObservations(self):
+        """
+        Gets the observation of every game, the same 11 features as SnakeGame.getObservation
+        :return: Bool array of shape (numGames, 11) of danger straight/right/left, the direction
+                 (left, right, up, down) and where the food is (left, right, up, down)
+        """
+        observations = np.empty((self.numGames, 11), dtype=bool)
+
+        # Probe the cells straight ahead, to the right and to the left of every head at once
+        probes = (self.direction[:, None] + TURNS) % 4
+        probeX = self.headX[:, None] + DX[probes]
+        probeY = self.headY[:, None] + DY[probes]
+
+        outOfBounds = (probeX < 0) | (probeX >= self.cols) | (probeY < 0) | (probeY >= self.rows)
+        cells = np.where(outOfBounds, 0, probeY * self.cols + probeX)
+        observations[:, 0:3] = outOfBounds | self.grid[self._games[:, None], cells]
+
+        # Move Direction
+        observations[:, 3] = self.direction == CLOCKWISE.index(Direction.LEFT)
+        observations[:, 4] = self.direction == CLOCKWISE.index(Direction.RIGHT)
+        observations[:, 5] = self.direction == CLOCKWISE.index(Direction.UP)
+        observations[:, 6] = self.direction == CLOCKWISE.index(Direction.DOWN)
+
+        # Food Location
+        observations[:, 7] = self.foodX < self.headX
+        observations[:, 8] = self.foodX > self.headX
+        observations[:, 9] = self.foodY < self.headY
+        observations[:, 10] = self.foodY > self.headY
+
+        return observations
+
+    def getBody(self, game):
+        """
+        Returns the body of one game's snake in pixels, head first
+        :param game: The index of the game
+        :return: List of Points making up the body
+        """
+        positions = (self.bodyStart[game] + np.arange(self.length[game])) % self.capacity
+        cells = self.body[game, positions]
+
+        return [Point(int(cell % self.cols) * BLOCKSIZE, int(cell // self.cols) * BLOCKSIZE) for cell in cells]
+
+    def getFood(self, game):
+        """
+        Returns the food of one game in pixels
+        :param game: The index of the game
+        :return: The Point of the food
+        """
+        return Point(int(self.foodX[game]) * BLOCKSIZE, int(self.foodY[game]) * BLOCKSIZE)